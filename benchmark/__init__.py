@@ -0,0 +1,5 @@
+""" Benchmarks for the linter
+
+$ python3 -m benchmark run [output.json]
+$ python3 -m benchmark compare old.json new.json
+"""
@@ -0,0 +1,33 @@
+""" $ python3 -m benchmark run [output.json]
+    $ python3 -m benchmark compare old.json new.json
+"""
+
+import json
+import sys
+
+from benchmark.run import run_benchmarks, compare
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "run":
+        output = sys.argv[2] if len(sys.argv) >= 3 else "benchmark.json"
+        res = run_benchmarks()
+        with open(output, "w", encoding='UTF-8') as fd:
+            json.dump(res, fd, indent=4)
+        for name, bench in res["benchmarks"].items():
+            print(f"{name:<40} {bench['min']:>10.4f}s")
+        print(f"[benchmark] results written to '{output}'")
+    elif len(sys.argv) == 4 and sys.argv[1] == "compare":
+        with open(sys.argv[2], "r", encoding='UTF-8') as fd:
+            old = json.load(fd)
+        with open(sys.argv[3], "r", encoding='UTF-8') as fd:
+            new = json.load(fd)
+        compare(old, new)
+    else:
+        print("$ python3 -m benchmark run [output.json]")
+        print("$ python3 -m benchmark compare old.json new.json")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
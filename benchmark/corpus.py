@@ -0,0 +1,111 @@
+""" Deterministic generator for synthetic .ir corpora
+"""
+
+import os
+import random
+from typing import List
+
+PROTOCOLS = ["NEC", "NECext", "RC5", "RC6", "Samsung32", "SIRC", "Kaseikyo"]
+NAMES = [
+    "Power", "Vol_up", "Vol_dn", "Ch_next", "Ch_prev", "Mute", "Ok", "Menu", "Back", "Input",
+    "Up", "Down", "Left", "Right", "Play", "Pause", "Stop", "Next", "Prev", "Info",
+]
+
+
+def _hex_bytes(rnd: random.Random) -> str:
+    return " ".join(f"{rnd.randrange(256):02X}" for _ in range(4))
+
+
+def _timings(rnd: random.Random, count: int) -> str:
+    return " ".join(str(rnd.randrange(200, 9000)) for _ in range(count))
+
+
+def generate_signal(rnd: random.Random, name: str, raw: bool, data_length: int = 68) -> List[str]:
+    """ Returns the lines of a single parsed or raw signal
+    """
+    if raw:
+        return [
+            f"name: {name}",
+            "type: raw",
+            "frequency: 38000",
+            "duty_cycle: 0.330000",
+            f"data: {_timings(rnd, data_length)}",
+        ]
+    return [
+        f"name: {name}",
+        "type: parsed",
+        f"protocol: {rnd.choice(PROTOCOLS)}",
+        f"address: {_hex_bytes(rnd)}",
+        f"command: {_hex_bytes(rnd)}",
+    ]
+
+
+def inject_error(rnd: random.Random, line: str) -> str:
+    """ Returns `line` with a typical mistake
+    """
+    mutation = rnd.randrange(8)
+    if mutation == 0:
+        return line + " "
+    if mutation == 1:
+        return line.replace(": ", ":", 1)
+    if mutation == 2:
+        return "  " + line
+    if mutation == 3:
+        return line.replace("NEC", "NECexf").replace("RC5", "RC55")
+    if mutation == 4:
+        return line.replace("0", "O", 1)
+    if mutation == 5:
+        return line.replace("a", "ä", 1)
+    if mutation == 6:
+        return "nme" + line[line.find(":"):] if ":" in line else line
+    return ""
+
+
+def generate_file(
+        rnd: random.Random, signals: int = 20, library: bool = False, raw_rate: float = 0.3,
+        error_rate: float = 0.0, long_data_rate: float = 0.0, long_data_length: int = 5_000
+) -> str:
+    """ Returns the content of a single .ir file
+
+    Attributes:
+        signals: Number of signals in the file
+        library: Generate an 'IR library file' header
+        raw_rate: Rate of raw signals
+        error_rate: Rate of lines with an injected error
+        long_data_rate: Rate of raw signals with a very long `data:` line
+        long_data_length: Number of timings in a long `data:` line
+    """
+    lines = ["Filetype: IR library file" if library else "Filetype: IR signals file", "Version: 1"]
+    for index in range(signals):
+        name = NAMES[index % len(NAMES)]
+        if index >= len(NAMES):
+            name = f"{name}_{index // len(NAMES)}"
+        data_length = long_data_length if rnd.random() < long_data_rate else rnd.randrange(4, 120, 2)
+        lines.append("# ")
+        lines.extend(generate_signal(rnd, name, rnd.random() < raw_rate, data_length))
+    if error_rate > 0:
+        lines = [inject_error(rnd, z) if i > 1 and rnd.random() < error_rate else z for i, z in enumerate(lines)]
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(
+        directory: str, files: int = 100, seed: int = 0, library_rate: float = 0.05,
+        library_signals: int = 1_000, **kwargs
+) -> List[str]:
+    """ Writes a corpus of `files` .ir files to `directory` and returns their paths
+
+    The same `seed` always produces the same corpus.
+    `kwargs` are passed to `generate_file`.
+    """
+    rnd = random.Random(seed)
+    paths = []
+    for index in range(files):
+        library = rnd.random() < library_rate
+        signals = library_signals if library else rnd.randrange(5, 60)
+        sub_dir = os.path.join(directory, f"brand_{index % 10}")
+        os.makedirs(sub_dir, exist_ok=True)
+        path = os.path.join(sub_dir, f"remote_{index}.ir")
+        with open(path, "w", encoding='UTF-8') as fd:
+            fd.write(generate_file(rnd, signals, library, **kwargs))
+        paths.append(path)
+    return paths
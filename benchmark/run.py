@@ -0,0 +1,158 @@
+""" Benchmark runner
+"""
+
+import contextlib
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+import lint
+from config import load_name_check_config
+from lint import Check, Context, ParsedLine, check_file
+from main import FORMATS, load_format
+
+from benchmark.corpus import generate_corpus, NAMES
+
+REPEAT = 3
+
+
+def measure(func: Callable[[], None], repeat: int = REPEAT) -> dict:
+    """ Runs `func` `repeat` times and returns the min. and mean duration in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {
+        "min": min(durations),
+        "mean": sum(durations) / len(durations),
+        "repeat": repeat,
+    }
+
+
+def load_corpus(paths: List[str]) -> List[Tuple[str, List[str]]]:
+    corpus = []
+    for path in paths:
+        with open(path, "r", encoding='UTF-8') as fd:
+            corpus.append((path, fd.read().splitlines()))
+    return corpus
+
+
+def bench_check_file(corpus: List[Tuple[str, List[str]]]) -> dict:
+    def run():
+        for path, lines in corpus:
+            check_file(path, lines, lambda *_: None)
+    return measure(run)
+
+
+def bench_checks(corpus: List[Tuple[str, List[str]]]) -> dict:
+    """ Runs every Check subclass on its own over all lines of the corpus
+    """
+    parsed_corpus = [(path, [(z, ParsedLine(z)) for z in lines]) for path, lines in corpus]
+    results = {}
+    for check_type in Check.__subclasses__():
+        def run():
+            for path, lines in parsed_corpus:
+                check = check_type()
+                context = Context()
+                for lnr, (line, parsed) in enumerate(lines, 1):
+                    check.check(context, path, lnr, line, parsed)
+        results[check_type.__name__] = measure(run)
+    return results
+
+
+def bench_name_rewrite(rules: int = 2_000) -> dict:
+    """ Looks up every name of the generator against a rule set with `rules` rewrites
+    """
+    rnd = random.Random(0)
+    rewrites = {}
+    for index in range(rules):
+        patterns = [f"{rnd.choice(NAMES).lower()}_{index}", f"/{rnd.choice(NAMES).lower()}_{index}_.*/"]
+        rewrites[f"Target_{index}"] = patterns
+    config = load_name_check_config({"*": rewrites, "brand_*/*": {"Power": ["pwr", "/on_?off/"]}})
+    names = [f"{z.lower()}_{i}" for i in range(0, rules, 7) for z in NAMES]
+
+    def run():
+        for index, name in enumerate(names):
+            config.get_name_rewrite(f"brand_{index % 10}/remote_{index}.ir", name)
+    return measure(run)
+
+
+def bench_formats(corpus: List[Tuple[str, List[str]]]) -> dict:
+    """ Passes the results of the corpus to every format (output is discarded)
+    """
+    file_results = []
+    for path, lines in corpus:
+        results = []
+        check_file(path, lines, lambda _, lnr, line, result: results.append((lnr, line, result)))
+        file_results.append((path, results))
+
+    results = {}
+    for name in FORMATS:
+        def run():
+            fmt = load_format(name)
+            error_counter = lint.ErrorCounter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                for index, (path, res) in enumerate(file_results):
+                    error_counter.reset_file()
+                    if callback := fmt.get("file_start"):
+                        callback(path, index, len(file_results))
+                    for lnr, line, result in res:
+                        error_counter.inc_file()
+                        fmt.get("result", lambda *_: None)(path, lnr, line, result)
+                    if callback := fmt.get("file_done"):
+                        callback(path, error_counter)
+                if callback := fmt.get("all_done"):
+                    callback(error_counter)
+        results[name] = measure(run)
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks() -> dict:
+    """ Generates the corpora and runs all benchmarks
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        clean = load_corpus(generate_corpus(os.path.join(directory, "clean"), seed=1))
+        broken = load_corpus(generate_corpus(os.path.join(directory, "broken"), seed=2, error_rate=0.05))
+        raw = load_corpus(generate_corpus(
+            os.path.join(directory, "raw"), files=20, seed=3, raw_rate=1.0, long_data_rate=0.2
+        ))
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "benchmarks": {
+            "check_file/clean": bench_check_file(clean),
+            "check_file/broken": bench_check_file(broken),
+            "check_file/raw": bench_check_file(raw),
+            **{f"check/{k}": v for k, v in bench_checks(broken).items()},
+            "name_rewrite": bench_name_rewrite(),
+            **{f"format/{k}": v for k, v in bench_formats(broken).items()},
+        },
+    }
+
+
+def compare(old: dict, new: dict) -> None:
+    """ Prints the min. durations of two benchmark runs side by side
+    """
+    print(f"{'benchmark':<40} {old['revision']:>10} {new['revision']:>10} {'change':>8}")
+    for name, new_res in new["benchmarks"].items():
+        if (old_res := old["benchmarks"].get(name)) is None:
+            print(f"{name:<40} {'-':>10} {new_res['min']:>10.4f}")
+            continue
+        change = (new_res["min"] / old_res["min"] - 1) * 100 if old_res["min"] else 0
+        print(f"{name:<40} {old_res['min']:>10.4f} {new_res['min']:>10.4f} {change:>+7.1f}%")
@@ -1,14 +1,17 @@
 import fnmatch
+import hashlib
 import json
+import os
+import pickle
 import re
 from typing import Union, Optional
 
+DEFAULT_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "fff-ir-lint"
+)
 
-def str_match_pattern(haystack: str, pattern: Union[str, re.Pattern]):
-    if type(pattern) == str:
-        return pattern.lower() == haystack.lower()
-    elif type(pattern) == re.Pattern:
-        return pattern.match(haystack.lower())
+# number of file names whose matching prefixes are memoized
+MAX_FILE_PREFIXES = 4096
 
 
 def str_get_pattern(pattern: str) -> Union[str, re.Pattern]:
@@ -17,24 +20,166 @@ def str_get_pattern(pattern: str) -> Union[str, re.Pattern]:
     return pattern
 
 
+class MergedPattern:
+    """ Alternation of multiple patterns with one named group per pattern
+
+    The pattern is compiled on first use and not stored in snapshots (see `load_config_snapshot`),
+    so loading a snapshot doesn't compile patterns which are never used.
+    """
+
+    def __init__(self, source: str, flags: int, group_index: dict[str, int], compiled: re.Pattern = None) -> None:
+        self.source = source
+        self.flags = flags
+        self.group_index = group_index
+        self._compiled = compiled
+
+    def match(self, value: str) -> Optional[int]:
+        """ Returns the index of the first pattern matching `value`
+        """
+        if self._compiled is None:
+            self._compiled = re.compile(self.source, self.flags)
+        if res := self._compiled.match(value):
+            return self.group_index[res.lastgroup]
+        return None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_compiled"] = None
+        return state
+
+
+def merge_patterns(patterns: list[tuple[int, re.Pattern]]) -> Optional[MergedPattern]:
+    """ Merges `patterns` into a single alternation with one named group per pattern
+
+    Returns None if the patterns cannot be merged (e.g. because of back-references or inline flags)
+    """
+    if len(patterns) == 0 or len({z.flags for _, z in patterns}) != 1:
+        return None
+    group_index = {}
+    alternatives = []
+    for i, (index, pattern) in enumerate(patterns):
+        # numbered back-references would point to the wrong group after merging
+        if re.search(r"\\[1-9]|\(\?P=", pattern.pattern):
+            return None
+        group = f"_p{i}"
+        group_index[group] = index
+        alternatives.append(f"(?P<{group}>{pattern.pattern})")
+    source, flags = "|".join(alternatives), patterns[0][1].flags
+    try:
+        return MergedPattern(source, flags, group_index, re.compile(source, flags))
+    except re.error:
+        return None
+
+
+def pattern_first_char(pattern: str) -> Optional[str]:
+    """ Returns the character every match of `pattern` starts with, or None if it can't be determined
+
+    Only simple patterns are considered, e.g. 'power_.*' => 'p', but 'p?ower' or 'a|b' => None
+    """
+    if not pattern or "|" in pattern:
+        return None
+    if not (pattern[0].isalnum() or pattern[0] in "_- "):
+        return None
+    if len(pattern) > 1 and pattern[1] in "*?{":
+        return None
+    return pattern[0]
+
+
+class NamePatternIndex:
+    """ Index over the name rewrites of a single path prefix
+
+    Exact-string patterns are looked up in a dict and the regex patterns are matched at once,
+    the rewrite which was defined first wins (same as checking every pattern one by one).
+    Regex patterns are bucketed by the character their matches start with,
+    so a lookup only runs the alternation of the patterns which can match at all.
+    """
+
+    def __init__(self, rewrites: dict[str, list[Union[str, re.Pattern]]]) -> None:
+        self.names = list(rewrites.keys())
+        self.exact: dict[str, int] = {}
+        regex_patterns: list[tuple[int, re.Pattern]] = []
+        for index, patterns in enumerate(rewrites.values()):
+            for pattern in patterns:
+                if type(pattern) == str:
+                    self.exact.setdefault(pattern.lower(), index)
+                elif type(pattern) == re.Pattern:
+                    regex_patterns.append((index, pattern))
+
+        by_char: dict[str, list[tuple[int, re.Pattern]]] = {}
+        anywhere: list[tuple[int, re.Pattern]] = []
+        for index, pattern in regex_patterns:
+            if (char := pattern_first_char(pattern.pattern)) is not None:
+                by_char.setdefault(char, []).append((index, pattern))
+            else:
+                anywhere.append((index, pattern))
+
+        # patterns without a known first character are part of every bucket
+        self.buckets = {
+            char: merge_patterns(sorted(patterns + anywhere, key=lambda z: z[0]))
+            for char, patterns in by_char.items()
+        }
+        self.default_bucket = merge_patterns(anywhere)
+
+        # patterns are checked one by one if they couldn't be merged
+        self.unmerged = []
+        if None in self.buckets.values() or (len(anywhere) > 0 and self.default_bucket is None):
+            self.buckets, self.default_bucket = {}, None
+            self.unmerged = regex_patterns
+
+    def match(self, value: str) -> Optional[str]:
+        value = value.lower()
+        best = self.exact.get(value, len(self.names))
+        if merged := self.buckets.get(value[:1], self.default_bucket):
+            if (index := merged.match(value)) is not None:
+                best = min(best, index)
+        for index, pattern in self.unmerged:
+            if index >= best:
+                break
+            if pattern.match(value):
+                best = index
+                break
+        return self.names[best] if best < len(self.names) else None
+
+
 class NameCheckConfig:
     prefixes: dict[str, dict[str, list[Union[str, re.Pattern]]]]
 
     def __init__(self, prefixes):
         self.prefixes = prefixes
+        self.index = [(prefix.lower(), NamePatternIndex(rewrites)) for prefix, rewrites in prefixes.items()]
+        self._file_prefixes: dict[str, list[NamePatternIndex]] = {}
 
-    def _get_name_rewrite_for_prefix(self, prefix: str, value: str) -> Optional[str]:
-        for new_name, vals in self.prefixes[prefix].items():
-            for val in vals:
-                if str_match_pattern(value, val):
-                    return new_name
-        return None
+    def __getstate__(self):
+        # only the index is needed for lookups,
+        # the (compiled) patterns of `prefixes` are not part of snapshots
+        state = self.__dict__.copy()
+        state["prefixes"] = None
+        state["_file_prefixes"] = {}
+        return state
+
+    def _get_prefixes_for_file(self, file_name: str) -> list[NamePatternIndex]:
+        """ Returns the indices of all prefixes matching `file_name` (memoized per file name)
+        """
+        # only the name is kept, not the object (e.g. an `ArchiveMember` with the content of the file)
+        file_name = str(file_name)
+        if (res := self._file_prefixes.get(file_name)) is None:
+            lower_file_name = file_name.lower()
+            res = [index for prefix, index in self.index if fnmatch.fnmatch(lower_file_name, prefix)]
+            if len(self._file_prefixes) >= MAX_FILE_PREFIXES:
+                # the oldest file name is evicted first
+                del self._file_prefixes[next(iter(self._file_prefixes))]
+            self._file_prefixes[file_name] = res
+        return res
+
+    def rewrite_targets(self) -> list[str]:
+        """ Returns the names of all rewrites (of all prefixes)
+        """
+        return list(dict.fromkeys(name for _, index in self.index for name in index.names))
 
     def get_name_rewrite(self, file_name: str, value: str) -> Optional[str]:
-        for prefix in self.prefixes.keys():
-            if fnmatch.fnmatch(file_name.lower(), prefix.lower()):
-                if res := self._get_name_rewrite_for_prefix(prefix, value):
-                    return res
+        for index in self._get_prefixes_for_file(file_name):
+            if res := index.match(value):
+                return res
         return None
 
 
@@ -88,5 +233,60 @@ def load_config(file_path: str) -> Config:
     return Config(ncc)
 
 
+def _snapshot_version() -> str:
+    # snapshots are invalid if the classes in this file change
+    with open(__file__, "rb") as fd:
+        return hashlib.sha256(fd.read()).hexdigest()
+
+
+def load_config_snapshot(file_path: str, snapshot_dir: str = DEFAULT_CACHE_DIR) -> Config:
+    """ Same as `load_config`, but uses a snapshot of the loaded config if the config file didn't change
+
+    The snapshot is keyed by the mtime and size of the config file and the hash of its content,
+    so the group expansion, the index and the regex compilation are skipped for an unchanged config.
+    """
+    snapshot_path = os.path.join(
+        snapshot_dir, "config-" + hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:16] + ".pickle"
+    )
+    stat = os.stat(file_path)
+    version = _snapshot_version()
+
+    with open(file_path, "rb") as fd:
+        content = None
+        try:
+            with open(snapshot_path, "rb") as snapshot:
+                header = pickle.load(snapshot)
+                if header["version"] == version:
+                    if header["mtime"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+                        return pickle.load(snapshot)
+                    content = fd.read()
+                    if header["sha256"] == hashlib.sha256(content).hexdigest():
+                        return pickle.load(snapshot)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+            pass
+        if content is None:
+            content = fd.read()
+
+    data: dict = json.loads(content)
+    config = Config(load_name_check_config(data.get('name-check', {})))
+
+    header = {
+        "version": version,
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        with open(tmp_path, "wb") as snapshot:
+            pickle.dump(header, snapshot)
+            pickle.dump(config, snapshot)
+        os.replace(tmp_path, snapshot_path)
+    except OSError:
+        pass
+    return config
+
+
 def empty_config() -> Config:
     return Config(load_name_check_config({}))
@@ -3,25 +3,64 @@ roughly checks an .ir file for errors.
 no warranty.
 """
 
+import io
 import os
 import re
-from difflib import get_close_matches
-from typing import List, TextIO, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from config import Config, load_config, empty_config
+from config import Config, load_config_snapshot, empty_config
+from lint_suggest import SuggestionEngine
 
 EXIT_NONE = 0
 EXIT_CURRENT_LINE = 1
 EXIT_ALL_LINES = 2
 EXIT_CURRENT_CHECK_FOR_ALL_LINES = 3
 
+# returned by `Check.keys` to run a check on every line with a key
+ANY_KEY = "*"
+
+# bump if results change for the same input, e.g. when checks are added or changed
+VERSION = "1.1.0"
+
 ###
 
-_config: Config
-if config_file := os.getenv("LINTER_CONFIG"):
-    _config = load_config(config_file)
-else:
-    _config = empty_config()
+_config: Optional[Config] = None
+
+
+def get_config() -> Config:
+    """ Returns the config, the `LINTER_CONFIG` is loaded on first use
+    """
+    global _config
+    if _config is None:
+        if config_file := os.getenv("LINTER_CONFIG"):
+            _config = load_config_snapshot(config_file)
+        else:
+            _config = empty_config()
+    return _config
+
+
+def set_config(config: Config) -> None:
+    """ Replaces the config used by the checks, e.g. after the config file changed
+    """
+    global _config
+    _config = config
+    _suggestions.register_provider("names", _name_rewrite_targets)
+
+
+def _name_rewrite_targets() -> List[str]:
+    return get_config().name_check_config.rewrite_targets()
+
+
+# shared by all checks, see `Check.suggest`
+_suggestions = SuggestionEngine()
+_suggestions.register_provider("names", _name_rewrite_targets)
+
+
+def get_suggestions() -> SuggestionEngine:
+    """ Returns the suggestion engine,
+    the vocabularies "keys", "protocols" and "names" (name rewrite targets) are always available
+    """
+    return _suggestions
 
 
 ###
@@ -57,6 +96,10 @@ class ErrorIndicator:
             "end": self.end,
         }
 
+    @staticmethod
+    def from_obj(obj: dict) -> 'ErrorIndicator':
+        return ErrorIndicator(obj["start"], obj["end"])
+
 
 def create_error_indicator_array(
         length: int, indicators: List[ErrorIndicator], symbol='^'
@@ -103,12 +146,17 @@ class Result:
         self.indicators = indicators
         self.error = error
         self.suggestion = suggestion
+        # if the suggestion can be applied without review (see `without_autofix`)
+        self.autofix = True
+        # name of the check which produced this result
+        self.check = None
 
-    def update(self, line: str):
+    def update(self, line: str, check: str = None):
         """ Fix all ErrorIndicators from current test
         """
         for indicator in self.indicators:
             indicator.fix(line)
+        self.check = check
 
     def with_exit_rule(self, exit_rule: int) -> 'Result':
         """ Controls how to continue after the check
@@ -122,14 +170,31 @@ class Result:
         self.exit_rule = exit_rule
         return self
 
+    def without_autofix(self) -> 'Result':
+        """ The suggestion has to be reviewed, so it's not applied by lint_fix.py
+        (e.g. it changes a value or replaces a whole line)
+        """
+        self.autofix = False
+        return self
+
     def to_obj(self):
         return {
             "exit_rule": self.exit_rule,
             "indicators": [z.to_obj() for z in self.indicators],
             "error": self.error,
-            "suggestion": self.suggestion
+            "suggestion": self.suggestion,
+            "check": self.check,
         }
 
+    @staticmethod
+    def from_obj(obj: dict) -> 'Result':
+        result = Result(
+            obj["exit_rule"], [ErrorIndicator.from_obj(z) for z in obj["indicators"]],
+            obj["error"], obj["suggestion"]
+        )
+        result.check = obj.get("check")
+        return result
+
 
 def multi_indicator_result(
         indicators: List[ErrorIndicator], error: str, suggestion: str = None
@@ -174,15 +239,38 @@ sirt = single_indicator_result_to
 
 ###
 
+class NameIndex:
+    """ Index of the signal names of all checked files
+
+    Used to find the same signal name in sibling files (files in the same directory).
+    The index is filled while the files are checked, so every file is only read once.
+    """
+
+    def __init__(self) -> None:
+        self.names: Dict[Tuple[str, str], Tuple[str, int]] = {}
+
+    def add(self, file_path: str, lnr: int, lower_name: str) -> Optional[Tuple[str, int]]:
+        """ Adds a name and returns the file path and line number of the first usage
+        if the name was already used in a sibling file
+        """
+        key = (os.path.dirname(file_path), lower_name)
+        first = self.names.setdefault(key, (file_path, lnr))
+        if first[0] != file_path:
+            return first
+        return None
+
+
 class Context:
     """ Shared context for all checks
 
     Can be used to check if another check already failed or to store data between checks
     """
 
-    def __init__(self) -> None:
+    def __init__(self, name_index: NameIndex = None) -> None:
         self.result = {}
         self.last_key = None
+        # optional index shared between files
+        self.name_index = name_index
 
     def update_result(self, check: type, result: Result) -> None:
         """ Update check `result` for specified `check`
@@ -200,23 +288,100 @@ class Context:
         self.last_key = key
 
 
+###
+
+class ParsedLine:
+    """ ParsedLine holds the facts about a single line which are needed by multiple checks
+
+    The line is tokenized once and then passed to every check,
+    so the checks don't have to split and strip the line again.
+
+    '  name:  Power '
+       ^^^^   ^^^^^
+       key    value_stripped (value_start: 9)
+    """
+
+    __slots__ = (
+        "line", "is_comment", "is_ascii", "leading", "trailing",
+        "colon", "key", "value", "value_stripped", "value_start",
+    )
+
+    def __init__(self, line: str, is_ascii: bool = False) -> None:
+        self.line = line
+        self.is_comment = line.startswith("#")
+        # only printable ASCII characters (`is_ascii` can be passed if this is known for the whole file)
+        self.is_ascii = is_ascii or (line.isascii() and line.isprintable())
+
+        # leading whitespace: line[:leading], trailing whitespace: line[trailing:]
+        stripped = line.lstrip()
+        self.leading = len(line) - len(stripped)
+        self.trailing = self.leading + len(stripped.rstrip())
+
+        # key-value pair, key and value are None if the line contains no ':'
+        self.colon = line.find(":")
+        if self.colon == -1:
+            self.key = None
+            self.value = None
+            self.value_stripped = None
+            self.value_start = -1
+        else:
+            self.key = line[:self.colon]
+            self.value = line[self.colon + 1:]
+            value = self.value.lstrip()
+            self.value_stripped = value.rstrip()
+            self.value_start = len(line) - len(value) if value else len(line)
+
+    def is_blank(self) -> bool:
+        """ Returns if the line contains only whitespace
+        """
+        return self.leading == len(self.line)
+
+
 ###
 
 class Check:
     """ Check represents a check for one line
     """
 
+    # if the suggestions of this check can be applied without review (see lint_fix.py)
+    autofix = True
+    # if the check can only fail for lines with characters other than printable ASCII
+    only_non_ascii = False
+
     def __init__(self) -> None:
         self.active = True
 
-    def check(self, ctx: Context, file_path: str, lnr: int, line: str) -> Optional[Result]:
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
         """ Check `line` against current check
         """
 
     def ignore_if_failed(self) -> list:
-        """ Do not run this check if one of the returned checks failed
+        """ Do not run this check if one of the returned checks failed (or was skipped) on the same line
         """
 
+    def keys(self) -> Optional[tuple]:
+        """ Keys of the lines this check can return a result for
+
+        None: all lines, (ANY_KEY,): all lines with a key, otherwise only lines with one of the keys
+        """
+        return None
+
+    @staticmethod
+    def suggest(vocabulary: str, word: str) -> Optional[str]:
+        """ Returns the closest word to `word` of the vocabulary `vocabulary` (see `get_suggestions`) or None
+        """
+        return _suggestions.suggest(vocabulary, word)
+
+    def get_state(self):
+        """ Returns the state kept between lines, see `set_state`
+        """
+        return self.active
+
+    def set_state(self, state) -> None:
+        """ Restores a state returned by `get_state`
+        """
+        self.active = state
+
     def set_active(self, active: bool):
         """ Can be used to disable a check for all other lines
         """
@@ -232,8 +397,8 @@ class EmptyLineCheck(Check):
     """ Checks for empty lines
     """
 
-    def check(self, ctx: Context, file_path: str, lnr: int, line: str) -> Optional[Result]:
-        if len(line.strip()) == 0:
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
+        if parsed.is_blank():
             return sir(0, 1,
                        "empty lines are not allowed. use comments for separation", suggestion="#"
                        ).with_exit_rule(EXIT_CURRENT_LINE)
@@ -246,10 +411,11 @@ class WhiteSpaceCommentCheck(Check):
      ^^
     """
 
-    def check(self, ctx: Context, file_path: str, lnr: int, line: str) -> Optional[Result]:
-        if line.strip().startswith("#") and not line.startswith("#"):
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
+        if not parsed.is_comment and line.startswith("#", parsed.leading):
             return sirt(
-                line.index("#"), "white space before comment not allowed", suggestion=line.strip()
+                parsed.leading, "white space before comment not allowed",
+                suggestion=line[parsed.leading:parsed.trailing]
             ).with_exit_rule(EXIT_CURRENT_LINE)
         return None
 
@@ -262,27 +428,22 @@ class WhiteSpaceCheck(Check):
 
     def __init__(self) -> None:
         super().__init__()
-        self.start_pattern = re.compile(r"^(\s+)")
-        self.end_pattern = re.compile(r"(\s+)$")
         self.multi_space_pattern = re.compile(r"\s{2,}")
 
     def ignore_if_failed(self) -> list:
         return [WhiteSpaceCommentCheck]
 
-    def check(self, ctx: Context, file_path: str, _: int, line: str) -> Optional[Result]:
+    def check(self, ctx: Context, file_path: str, _: int, line: str, parsed: ParsedLine) -> Optional[Result]:
         # start of line
-        res = self.start_pattern.findall(line)
-        if len(res) > 0:
-            return sirt(len(res[0]), "lines cannot start with spaces", suggestion=line.lstrip(' '))
+        if parsed.leading > 0:
+            return sirt(parsed.leading, "lines cannot start with spaces", suggestion=line.lstrip(' '))
         # end of line
-        res = self.end_pattern.findall(line)
-        if len(res) > 0:
-            return sirf(len(line) - len(res[0]),
+        if parsed.trailing < len(line):
+            return sirf(parsed.trailing,
                         "lines cannot end with spaces", suggestion=line.rstrip(' '))
-        # check using 'strip'
-        if line.strip() != line:
-            return sirf(0, "lines cannot start or end with whitespace", suggestion=line.strip())
         # multi space check
+        if parsed.is_ascii and '  ' not in line:
+            return None
         res = []
         for search in self.multi_space_pattern.finditer(line):
             span = search.span()
@@ -304,25 +465,52 @@ class DescriptorCheck(Check):
         super().__init__()
         self.version_pattern = re.compile(r"^Version:\s\d+$")
 
-    def check(self, ctx: Context, file_path: str, lnr: int, line: str) -> Optional[Result]:
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
         if lnr == 1 and line != "Filetype: IR signals file" and line != "Filetype: IR library file":
-            return sirf(0, "first line must contain 'Filetype: IR signals file'",
-                        suggestion='Filetype: IR signals file')
+            res = sirf(0, "first line must contain 'Filetype: IR signals file'",
+                       suggestion='Filetype: IR signals file')
+            # without the key, the line is probably missing and replacing the line would lose its content
+            return res if (parsed.key or "").strip().lower() == "filetype" else res.without_autofix()
         if lnr == 2 and not self.version_pattern.match(line):
-            return sirf(0, "second line must contain 'Version: \\d'",
-                        suggestion='Version: 1')
+            res = sirf(0, "second line must contain 'Version: \\d'",
+                       suggestion='Version: 1')
+            return res if (parsed.key or "").strip().lower() == "version" else res.without_autofix()
         return None
 
 
+class EncodingCheck(Check):
+    """ Checks a line for bytes which are not valid UTF-8
+
+    the bytes were replaced by U+FFFD when the file was decoded (see `decode_lines`)
+    """
+
+    only_non_ascii = True
+
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
+        if parsed.is_ascii or "\ufffd" not in line:
+            return None
+        resp = [ErrorIndicator(idx, idx + 1) for idx, char in enumerate(line) if char == "\ufffd"]
+        # the original characters are lost, so the line has to be fixed manually
+        return mir(resp, "invalid UTF-8 byte/s found, file must be UTF-8 encoded",
+                   suggestion=line.replace("\ufffd", "")).without_autofix()
+
+
 class NonASCIICheck(Check):
     """ Checks a line for non-ASCII characters
     """
 
+    only_non_ascii = True
+
     def __init__(self) -> None:
         super().__init__()
         self.pattern = re.compile(r"[^\x20-\x7E\xB0\x09]")
 
-    def check(self, ctx: Context, file_path: str, lnr: int, line: str) -> Optional[Result]:
+    def ignore_if_failed(self) -> list:
+        return [EncodingCheck]
+
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
+        if parsed.is_ascii:
+            return None
         resp = []
         for search in self.pattern.finditer(line):
             span = search.span()
@@ -332,8 +520,9 @@ class NonASCIICheck(Check):
             # if we remove non-ASCII chars there's probably some double spaces ['  ']
             while '  ' in suggestion:
                 suggestion = suggestion.replace('  ', ' ')
+            # removing characters changes names (e.g. "Lautstärke"), so it isn't applied by --fix
             return mir(resp, "non-ASCII character/s found", suggestion=suggestion) \
-                .with_exit_rule(EXIT_CURRENT_LINE)
+                .with_exit_rule(EXIT_CURRENT_LINE).without_autofix()
         return None
 
 
@@ -356,6 +545,7 @@ class KeyValueValidityCheck(Check):
             "name", "type", "protocol", "address", "command",  # parsed signal
             "frequency", "duty_cycle", "data"  # raw signal
         ]
+        get_suggestions().register("keys", self.valid_keys)
 
     def ignore_if_failed(self) -> list:
         """
@@ -363,16 +553,16 @@ class KeyValueValidityCheck(Check):
         """
         return [DescriptorCheck]
 
-    def check(self, ctx: Context, file_path: str, lnr: int, line: str) -> Optional[Result]:
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
         # parse key
-        if ':' not in line:
+        if parsed.key is None:
             return sirf(0, "line is no key-value pair. 'key: value' expected") \
                 .with_exit_rule(EXIT_CURRENT_LINE)
 
         # check that value starts with ' '
         # 'name:value' should be 'name: value'
-        value_start_index = line.index(":") + 1
-        if not line[value_start_index:].startswith(' '):
+        value_start_index = parsed.colon + 1
+        if not parsed.value.startswith(' '):
             # error but don't stop processing current line
             return sir(
                 value_start_index - 1, value_start_index, "space missing after ':'",
@@ -384,13 +574,12 @@ class KeyValueValidityCheck(Check):
             return sirf(0, f"key-value pattern does not match expression '{self.pattern_str}'")
 
         # check if key is valid
-        key = line[:line.index(":")]
+        key = parsed.key
         if key not in self.valid_keys:
             # find the best similar key
-            similar = get_close_matches(key, self.valid_keys)
             suggestion = None
-            if len(similar) > 0:
-                suggestion = f"{similar[0]}:{line[value_start_index:]}"
+            if similar := self.suggest("keys", key):
+                suggestion = f"{similar}:{parsed.value}"
             return sirt(len(key), f"key '{key}' unknown", suggestion=suggestion) \
                 .with_exit_rule(EXIT_NONE)
         ctx.set_last_key(key)
@@ -405,6 +594,9 @@ class SignalKeyOrderCheck(Check):
     otherwise there will be problems
     """
 
+    # the suggested line is only a placeholder
+    autofix = False
+
     def __init__(self) -> None:
         super().__init__()
         self.ignored_order_keys = [
@@ -428,24 +620,24 @@ class SignalKeyOrderCheck(Check):
             "data": ["data", "name"]
         }
 
-    def check(self, ctx: Context, file_path: str, lnr: int, line: str) -> Optional[Result]:
-        split = line.split(":", 1)
-        if len(split) != 2:
-            return sirf(0, f"cannot unpack key-value {len(split)} > 2")
-        key, value = split
-        key, value = key.strip(), value.strip()
+    def keys(self) -> Optional[tuple]:
+        return ANY_KEY,
+
+    def get_state(self):
+        return self.active, self.expected_key
+
+    def set_state(self, state) -> None:
+        self.active, self.expected_key = state
+
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
+        if parsed.key is None:
+            return sirf(0, "cannot unpack key-value 1 > 2")
+        key, value = parsed.key.strip(), parsed.value_stripped
 
         if key in self.ignored_order_keys:
             return None
 
-        key_end = line.index(":")
-
-        value_start = key_end + 1
-        for char in line[key_end + 1:]:
-            if char == ' ':
-                value_start += 1
-            else:
-                break
+        key_end = parsed.colon
 
         if key not in self.order:
             return sirt(key_end, "key has no order-rule") \
@@ -471,6 +663,7 @@ class SignalKeyOrderCheck(Check):
             self.expected_key = next_expected
         elif isinstance(next_expected, dict):
             if value not in next_expected:
+                value_start = key_end + 1 + len(parsed.value) - len(parsed.value.lstrip(' '))
                 e_k = ', '.join(next_expected.keys())
                 return sirf(value_start, f"[lint]: can't find next expected key in [{e_k}]") \
                     .with_exit_rule(EXIT_CURRENT_CHECK_FOR_ALL_LINES)
@@ -492,6 +685,9 @@ class DataValidityCheck(Check):
     data: 100 213 1-1 42
                    ^
 
+    data: 9000 -4500 0 560
+               ^^^^^ ^
+
     address: 10 FG FF AA
                  ^
     """
@@ -515,14 +711,74 @@ class DataValidityCheck(Check):
             "Kaseikyo",
             "RCA"
         ]
+        get_suggestions().register("protocols", self.valid_protocols)
         self.frequency_range = (10_000, 56_000)
-        self.names = []
+        # raw data: integers separated by spaces
+        # (every separator must be followed by a number, so the pattern can only match in one way,
+        # leading and trailing spaces are stripped before matching)
+        self.data_pattern = re.compile(r"-?[0-9]+(?: +-?[0-9]+)*")
+        self.timing_pattern = re.compile(r"-?[0-9]+")
+        # plausible duration of a single timing (in microseconds)
+        self.timing_range = (1, 500_000)
+        # max. number of timings of a raw signal (Flipper: MAX_TIMINGS_AMOUNT)
+        self.max_timings = 1024
+        # lower name => line number of first usage
+        self.names: Dict[str, int] = {}
 
     def ignore_if_failed(self) -> list:
         return [KeyValueValidityCheck]
 
+    def keys(self) -> Optional[tuple]:
+        return "data", "address", "command", "protocol", "duty_cycle", "frequency", "name"
+
+    def get_state(self):
+        # names are only added, so the number of names is enough to restore them
+        return self.active, len(self.names)
+
+    def set_state(self, state) -> None:
+        self.active, name_count = state
+        while len(self.names) > name_count:
+            self.names.popitem()
+
+    def check_key_data(self, key: str, value: str) -> Optional[Result]:
+        # fast path: the whole value is valid, so the characters don't have to be checked one by one
+        if not self.data_pattern.fullmatch(value.strip(" ")):
+            # a lone '-' (or an empty value) doesn't match the pattern, but is no invalid character
+            if (result := self.check_data_chars(key, value)) is not None:
+                return result
+        return self.check_data_timings(key, value)
+
+    def check_data_timings(self, key: str, value: str) -> Optional[Result]:
+        try:
+            timings = list(map(int, value.split()))
+        except ValueError:
+            # lone '-' (allowed by `check_data_chars`, but no timing)
+            timings = [int(z) for z in self.timing_pattern.findall(value)]
+        if len(timings) == 0:
+            return sirf(len(key) + 1, "data must contain at least one timing")
+
+        timing_min, timing_max = self.timing_range
+        if min(timings) >= timing_min and max(timings) <= timing_max and len(timings) <= self.max_timings:
+            return None
+
+        # only build the indicators if something is wrong
+        offset = len(key) + 1
+        too_short = []
+        too_long = []
+        for search in self.timing_pattern.finditer(value):
+            timing = int(search.group())
+            if timing < timing_min:
+                too_short.append(ErrorIndicator(offset + search.start(), offset + search.end()))
+            elif timing > timing_max:
+                too_long.append(ErrorIndicator(offset + search.start(), offset + search.end()))
+        if len(too_short) > 0:
+            return mir(too_short, "zero or negative timing not allowed")
+        if len(too_long) > 0:
+            return mir(too_long, f"timing outside of plausible range ({timing_min} - {timing_max} us)")
+        return sirf(offset, f"too many timings ({len(timings)} > {self.max_timings})")
+
     @staticmethod
-    def check_key_data(key: str, value: str) -> Optional[Result]:
+    def check_data_chars(key: str, value: str) -> Optional[Result]:
         marks = []
         begin = True
         for idx, char in enumerate(value):
@@ -553,12 +809,12 @@ class DataValidityCheck(Check):
 
     def check_key_protocol(self, key: str, value: str, value_start: int) -> Optional[Result]:
         if value.strip() not in self.valid_protocols:
-            similar = get_close_matches(value, self.valid_protocols)
             suggestion = None
-            if len(similar) > 0:
-                suggestion = f"{key}: {similar[0]}"
+            if similar := self.suggest("protocols", value):
+                suggestion = f"{key}: {similar}"
+            # the closest protocol is only a guess
             return sirf(value_start,
-                        f"Protocol '{value.strip()}' unknown", suggestion=suggestion)
+                        f"Protocol '{value.strip()}' unknown", suggestion=suggestion).without_autofix()
 
     @staticmethod
     def check_key_duty_cycle(value: str, value_start: int) -> Optional[Result]:
@@ -575,32 +831,39 @@ class DataValidityCheck(Check):
             freq_min, freq_max = self.frequency_range
             if frequency_value < freq_min or frequency_value > freq_max:
                 suggestion = f"{key}: {max(min(freq_max, frequency_value), freq_min)}"
+                # clamping changes the signal
                 return sirf(value_start, f"frequency outside of supported range ({freq_min} - {freq_max})",
-                            suggestion=suggestion)
+                            suggestion=suggestion).without_autofix()
         except ValueError:
             return sirf(value_start, "frequency must be an integer")
 
-    def check_key_name(self, file_path: str, key: str, value: str, value_start: int) -> Optional[Result]:
+    def check_key_name(
+            self, ctx: Context, file_path: str, lnr: int, key: str, value: str, value_start: int
+    ) -> Optional[Result]:
         name_check = value.strip()
         lower_name_check = name_check.lower()
 
         # check for duplicate name
-        if lower_name_check != 'unknown' and lower_name_check in self.names:
-            return sirf(value_start, f"ambiguous name '{name_check}'")
-        self.names.append(lower_name_check)
+        if lower_name_check != 'unknown':
+            first_lnr = self.names.setdefault(lower_name_check, lnr)
+            if first_lnr != lnr:
+                return sirf(value_start, f"ambiguous name '{name_check}' (first used in line {first_lnr})")
+            if ctx.name_index is not None:
+                if first := ctx.name_index.add(file_path, lnr, lower_name_check):
+                    return sirf(value_start, f"name '{name_check}' already used in '{first[0]}' (line {first[1]})")
 
         # check for name rewrite
-        if new_name := _config.name_check_config.get_name_rewrite(file_path, lower_name_check):
+        if new_name := get_config().name_check_config.get_name_rewrite(file_path, lower_name_check):
             if new_name != name_check:
                 suggestion = f"{key}: {new_name}"
                 return sirf(value_start, f"recommended name '{new_name}' (WIP)", suggestion=suggestion)
 
-    def check(self, ctx: Context, file_path: str, lnr: int, line: str) -> Optional[Result]:
-        split = line.split(":", 1)
-        if len(split) != 2:
+    def check(self, ctx: Context, file_path: str, lnr: int, line: str, parsed: ParsedLine) -> Optional[Result]:
+        if parsed.key is None:
             return sirf(0, "cannot unpack key-value")
-        key, value = split
-        value_start = line.index(value.strip(), len(key))
+        key, value = parsed.key, parsed.value
+        # an empty value is marked starting at the ':'
+        value_start = parsed.value_start if parsed.value_stripped else parsed.colon
 
         if key == "data":
             return self.check_key_data(key, value)
@@ -618,53 +881,144 @@ class DataValidityCheck(Check):
             return self.check_key_frequency(key, value, value_start)
 
         elif key == "name":
-            return self.check_key_name(file_path, key, value, value_start)
+            return self.check_key_name(ctx, file_path, lnr, key, value, value_start)
 
         return None
 
 
 ###
 
-def check_file(file_path: str, file_descriptor: TextIO, on_found=None) -> bool:
-    """ Checks a file for errors
+class CheckScheduler:
+    """ Decides which checks run on a line
+
+    Built once per file from the checks:
+     - the checks are ordered so that every check runs after the checks from its `ignore_if_failed`
+     - a dispatch table from key to the checks which can return a result for a line with that key
+    """
+
+    def __init__(self, checks: List[Check]) -> None:
+        self.dependencies: Dict[Check, tuple] = {z: tuple(z.ignore_if_failed() or ()) for z in checks}
+        self.checks = self._sort(checks)
+        self.dispatch: Dict[Optional[str], List[Check]] = {}
+
+    def _sort(self, checks: List[Check]) -> List[Check]:
+        """ Stable topological sort: keeps the given order if it already satisfies the dependencies
+        """
+        result = []
+        pending = list(checks)
+        while pending:
+            for check in pending:
+                deps = [z for z in pending if z is not check and type(z) in self.dependencies[check]]
+                if not deps:
+                    break
+            else:
+                raise ValueError(f"cyclic check dependencies: {', '.join(type(z).__name__ for z in pending)}")
+            pending.remove(check)
+            result.append(check)
+        return result
+
+    def for_key(self, key: Optional[str]) -> List[Check]:
+        """ Returns the checks for a line with the key `key` (None for lines without a key)
+        """
+        if (checks := self.dispatch.get(key)) is None:
+            checks = []
+            for check in self.checks:
+                keys = check.keys()
+                if keys is None or (key is not None and (ANY_KEY in keys or key in keys)):
+                    checks.append(check)
+            self.dispatch[key] = checks
+        return checks
+
+
+class FileChecker:
+    """ Runs the checks on the lines of a single file, one line at a time
+
+    The checks keep state between lines (e.g. the expected key or the names seen so far),
+    `get_state` and `set_state` can be used to check a line again, e.g. after it was fixed.
     """
 
-    # these checks are applied to "normal" lines
-    normal_checks = [
-        EmptyLineCheck(),
-        WhiteSpaceCommentCheck(),
-        WhiteSpaceCheck(),
-        DescriptorCheck(),
-        KeyValueValidityCheck(),
-        SignalKeyOrderCheck(),
-        DataValidityCheck(),
-        NonASCIICheck(),
-    ]
-
-    # these checks are applied to commented lines
-    comment_checks = [
-        NonASCIICheck(),
-    ]
-
-    did_pass = True
-    context = Context()
-
-    for _lnr, line in enumerate([z.strip("\n") for z in file_descriptor.readlines()]):
-        lnr = _lnr + 1  # human-readable line numbers
+    def __init__(
+            self, file_path: str, profiler=None, name_index=None, ascii_only: bool = False,
+            max_results: Optional[int] = None
+    ) -> None:
+        self.file_path = file_path
+        self.ascii_only = ascii_only
+        # the checks are canceled for all other lines after `max_results` results (like EXIT_ALL_LINES)
+        self.max_results = max_results
+        self.result_count = 0
+
+        # these checks are applied to "normal" lines
+        normal_checks = [
+            EmptyLineCheck(),
+            WhiteSpaceCommentCheck(),
+            WhiteSpaceCheck(),
+            DescriptorCheck(),
+            KeyValueValidityCheck(),
+            SignalKeyOrderCheck(),
+            DataValidityCheck(),
+            EncodingCheck(),
+            NonASCIICheck(),
+        ]
+
+        # these checks are applied to commented lines
+        comment_checks = [
+            EncodingCheck(),
+            NonASCIICheck(),
+        ]
+
+        # the checks for other characters can't fail if the whole file is printable ASCII
+        if ascii_only:
+            normal_checks = [z for z in normal_checks if not z.only_non_ascii]
+            comment_checks = [z for z in comment_checks if not z.only_non_ascii]
+
+        self.checks = normal_checks + comment_checks
+        if profiler is not None:
+            for check in self.checks:
+                profiler.wrap_check(check)
+
+        self.normal_scheduler = CheckScheduler(normal_checks)
+        self.comment_scheduler = CheckScheduler(comment_checks)
+
+        self.context = Context(name_index)
+        self.did_pass = True
+        # set if a check returned EXIT_ALL_LINES
+        self.stopped = False
+
+    def get_state(self) -> tuple:
+        return (
+            self.did_pass, self.stopped, self.result_count, self.context.last_key, self.context.result.copy(),
+            [z.get_state() for z in self.checks]
+        )
+
+    def set_state(self, state: tuple) -> None:
+        self.did_pass, self.stopped, self.result_count, self.context.last_key, result, check_states = state
+        # copied, so `state` can be restored again
+        self.context.result = result.copy()
+        for check, check_state in zip(self.checks, check_states):
+            check.set_state(check_state)
+
+    def check_line(self, lnr: int, line: str, on_found=None) -> None:
+        """ Checks a single line (without line break) and passes the results to `on_found`
+        """
+        parsed = ParsedLine(line, self.ascii_only)
 
         # comments
-        if line.startswith("#"):
-            checks = comment_checks
-        else:
-            checks = normal_checks
+        scheduler = self.comment_scheduler if parsed.is_comment else self.normal_scheduler
 
-        for check in [z for z in checks if z.is_active()]:
-            # check if check is disabled because a previous check failed
-            if isinstance(check.ignore_if_failed, list) and type(check) in check.ignore_if_failed:
+        # checks which failed or were skipped on the current line
+        failed = set()
+
+        for check in scheduler.for_key(parsed.key):
+            if not check.is_active():
+                continue
+
+            # check if check is disabled because a check it depends on failed
+            if (deps := scheduler.dependencies[check]) and not failed.isdisjoint(deps):
+                failed.add(type(check))
                 continue
 
             # execute check
-            resp: Result = check.check(context, file_path, lnr, line)
+            resp: Result = check.check(self.context, self.file_path, lnr, line, parsed)
 
             # if check passed, do nothing
             if resp is None:
@@ -673,29 +1027,74 @@ def check_file(file_path: str, file_descriptor: TextIO, on_found=None) -> bool:
                 print("[lint] result of response was not Result for check", type(check))
                 continue
             else:
-                did_pass = False
+                self.did_pass = False
+                failed.add(type(check))
 
             # add line number to result and fix markers
-            resp.update(line)
+            resp.update(line, type(check).__name__)
 
             # cache check result
-            context.update_result(type(check), resp)
+            self.context.update_result(type(check), resp)
 
             # pass result to callback
-            on_found(file_path, lnr, line, resp)
+            on_found(self.file_path, lnr, line, resp)
+
+            exit_rule = resp.exit_rule
+            self.result_count += 1
+            if self.max_results is not None and self.result_count >= self.max_results:
+                exit_rule = EXIT_ALL_LINES
 
-            if resp.exit_rule == EXIT_ALL_LINES:
+            if exit_rule == EXIT_ALL_LINES:
                 # cancel all other checks for all other lines
-                return did_pass
-            elif resp.exit_rule == EXIT_CURRENT_LINE:
+                self.stopped = True
+                return
+            elif exit_rule == EXIT_CURRENT_LINE:
                 # cancel all other checks for current line
                 break
-            elif resp.exit_rule == EXIT_CURRENT_CHECK_FOR_ALL_LINES:
+            elif exit_rule == EXIT_CURRENT_CHECK_FOR_ALL_LINES:
                 # cancel current check for all other lines
                 check.set_active(False)
                 break
 
-    return did_pass
+
+# bytes of a file which only contains printable ASCII (and line breaks)
+_not_printable_ascii = re.compile(rb"[^\x20-\x7E\r\n]")
+
+
+def decode_lines(data: bytes) -> Tuple[Iterable[str], bool]:
+    """ Decodes the content of a file lazily and splits it into lines (like a file opened in text mode)
+
+    Returns the lines and if the file only contains printable ASCII (see `check_file`).
+    Bytes which are not valid UTF-8 are replaced by U+FFFD and reported by `EncodingCheck`.
+    The lines are decoded chunk by chunk from `data` (not copied), so the decoded file is never kept in memory.
+    """
+    if data.isascii() and not _not_printable_ascii.search(data):
+        return io.TextIOWrapper(io.BytesIO(data), encoding="ascii"), True
+    return io.TextIOWrapper(io.BytesIO(data), encoding="UTF-8", errors="replace"), False
+
+
+def check_file(
+        file_path: str, file_descriptor: Iterable[str], on_found=None, profiler=None, name_index=None,
+        ascii_only: bool = False, max_results: Optional[int] = None
+) -> bool:
+    """ Checks a file for errors
+
+    `file_descriptor` can be any iterable of lines, e.g. an open file, `sys.stdin` or a list.
+    The lines are consumed lazily, so only the current line is kept in memory.
+
+    If a `profiler` (see lint_profile.Profiler) is passed, the checks are timed.
+    If a `name_index` is passed, signal names are also checked against the names of sibling files.
+    If `ascii_only` is set, the lines must only contain printable ASCII and the checks for other characters are skipped.
+    If `max_results` is set, the file is only checked until this number of results was found.
+    """
+    checker = FileChecker(file_path, profiler, name_index, ascii_only, max_results)
+
+    for lnr, line in enumerate(file_descriptor, 1):  # human-readable line numbers
+        checker.check_line(lnr, line.rstrip("\n"), on_found)
+        if checker.stopped:
+            break
+
+    return checker.did_pass
 
 
 class ErrorCounter:
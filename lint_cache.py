@@ -0,0 +1,108 @@
+""" Result Cache:
+stores the results of already checked files on disk,
+so unchanged files don't have to be checked again.
+"""
+
+import glob
+import hashlib
+import json
+import os
+from typing import List, Optional, Tuple
+
+from config import DEFAULT_CACHE_DIR
+from lint import Result, VERSION
+
+DEFAULT_MAX_ENTRIES = 50_000
+
+
+def linter_digest() -> str:
+    """ Returns a hash of everything that influences the results for a file
+
+    This includes the linter version, the linter source code and the loaded `LINTER_CONFIG`
+    """
+    digest = hashlib.sha256(VERSION.encode())
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for source in sorted(glob.glob(os.path.join(base_dir, "*.py"))):
+        with open(source, "rb") as fd:
+            digest.update(fd.read())
+    if config_file := os.getenv("LINTER_CONFIG"):
+        with open(config_file, "rb") as fd:
+            digest.update(fd.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """ ResultCache stores the serialized results per file in `directory`
+
+    An entry is keyed by the file path, the file content and the `linter_digest`.
+    The cache holds at most `max_entries` entries, the least recently used entries are evicted first.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.salt = linter_digest()
+
+    def key(self, file_path: str, content: bytes) -> str:
+        """ Returns the cache key for a file with the content `content`
+
+        The file path is part of the key, because the name-check config depends on it
+        """
+        digest = hashlib.sha256(self.salt.encode())
+        digest.update(file_path.encode())
+        digest.update(b"\0")
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[List[Tuple[int, str, Result]]]:
+        """ Returns the cached results for `key` or None if `key` is not cached
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding='UTF-8') as fd:
+                obj = json.load(fd)
+            # mark entry as recently used
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        try:
+            return [(z["lnr"], z["line"], Result.from_obj(z["result"])) for z in obj]
+        except (KeyError, TypeError):
+            return None
+
+    def put(self, key: str, results: List[Tuple[int, str, Result]]) -> None:
+        """ Stores `results` for `key`
+
+        The entry is written to a temporary file first which then replaces the entry,
+        so concurrent writers never produce a partially written entry
+        """
+        obj = [{"lnr": lnr, "line": line, "result": result.to_obj()} for lnr, line, result in results]
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w", encoding='UTF-8') as fd:
+                json.dump(obj, fd)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            pass
+
+    def prune(self) -> None:
+        """ Evicts the least recently used entries until at most `max_entries` entries are left
+        """
+        try:
+            with os.scandir(self.directory) as it:
+                entries = [(z.stat().st_mtime, z.path) for z in it if z.name.endswith(".json")]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, entry_path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
@@ -0,0 +1,141 @@
+""" Checkpoint:
+records every checked file, so an interrupted run can be resumed (see `--checkpoint` and `--resume`).
+
+the checkpoint file contains one JSON object per checked file:
+{"file": path, "hash": sha256 of the content, "results": [{"lnr": 1, "line": "...", "result": {...}}, ...]}
+
+when resuming, only the hash and the position of every entry are kept, the results are read when they are replayed.
+"""
+
+import hashlib
+import json
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lint import Result
+from lint_discover import read_content
+
+FileResults = Tuple[str, List[Tuple[int, str, Result]], Optional[str]]
+
+
+def content_hash(file: str) -> str:
+    return hashlib.sha256(read_content(file)).hexdigest()
+
+
+class Checkpoint:
+    """ Appends the results of every checked file to a checkpoint file
+
+    If `resume` is set, the files of an existing checkpoint file are not checked again
+    (unless their content changed), their stored results are replayed instead.
+    """
+
+    def __init__(self, path: str, resume: bool = False) -> None:
+        self.path = path
+        # file -> (hash, position of the entry in the checkpoint file), removed when replayed
+        self.finished: Dict[str, Tuple[str, int]] = {}
+        self.replayed = set()
+        # the checkpoint file opened for reading the replayed entries
+        self.reader = None
+
+        if resume:
+            self._load()
+        self.fd = open(path, "a" if resume else "w", encoding='UTF-8')
+
+    def _load(self) -> None:
+        try:
+            self.reader = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        line = b""
+        position = 0
+        for line in self.reader:
+            try:
+                entry = json.loads(line)
+                self.finished[entry["file"]] = (entry["hash"], position)
+            except (ValueError, KeyError, TypeError):
+                # the last line is incomplete if the run was killed while writing it
+                pass
+            position += len(line)
+        # appended entries must start on a new line
+        if line and not line.endswith(b"\n"):
+            with open(self.path, "a", encoding='UTF-8') as fd:
+                fd.write("\n")
+
+    def lookup(self, file: str) -> Optional[int]:
+        """ Returns the position of the stored entry of `file` (see `replay`) or None if it has to be checked
+        """
+        if (entry := self.finished.pop(file, None)) is None:
+            return None
+        stored_hash, position = entry
+        try:
+            if content_hash(file) != stored_hash:
+                return None
+        except OSError:
+            return None
+        self.replayed.add(file)
+        return position
+
+    def replay(self, position: int) -> List[Tuple[int, str, Result]]:
+        """ Reads the stored results of the entry at `position`
+        """
+        self.reader.seek(position)
+        entry = json.loads(self.reader.readline())
+        return [(z["lnr"], z["line"], Result.from_obj(z["result"])) for z in entry["results"]]
+
+    def add(self, file: str, results: List[Tuple[int, str, Result]], file_hash: Optional[str] = None) -> None:
+        """ Appends a checked file (replayed files are already part of the checkpoint)
+
+        `file_hash` is the hash of the checked content, the file is read again if it's not passed
+        """
+        if file in self.replayed:
+            return
+        self.fd.write(json.dumps({
+            "file": file,
+            "hash": file_hash or content_hash(file),
+            "results": [{"lnr": lnr, "line": line, "result": result.to_obj()} for lnr, line, result in results],
+        }) + "\n")
+        self.fd.flush()
+
+    def resume(
+            self, files: Iterable[str], check: Callable[[Iterable[str]], Iterator[FileResults]]
+    ) -> Iterator[FileResults]:
+        """ Yields (file, results, hash)-tuples in the order of `files` (the hash of replayed files is None)
+
+        The stored results are used for finished files, all other files are checked by `check`.
+        If `files` is a list, `check` gets a list of the unfinished files, otherwise they are passed lazily.
+        """
+        if isinstance(files, list):
+            finished = {}
+            unchecked = []
+            for file in files:
+                if (position := self.lookup(file)) is not None:
+                    finished[file] = position
+                else:
+                    unchecked.append(file)
+            checked = check(unchecked)
+            for file in files:
+                if file in finished:
+                    yield file, self.replay(finished.pop(file)), None
+                else:
+                    yield next(checked)
+            return
+
+        # the next unfinished file is passed to `check` right before its results are requested
+        pending = deque()
+
+        def feed():
+            while pending:
+                yield pending.popleft()
+
+        checked = check(feed())
+        for file in files:
+            if (position := self.lookup(file)) is not None:
+                yield file, self.replay(position), None
+            else:
+                pending.append(file)
+                yield next(checked)
+
+    def close(self) -> None:
+        self.fd.close()
+        if self.reader is not None:
+            self.reader.close()
@@ -0,0 +1,289 @@
+""" Corpus Analysis:
+finds duplicate signals and files which mostly duplicate another file.
+
+$ python3 lint_corpus.py [--json] [--threshold 0.8] [file_1] [file_2] ... [file_n]
+
+Parsed signals are duplicates if protocol, address and command are equal.
+Raw signals are duplicates if they have the same number of timings and every timing differs
+by at most `RAW_TOLERANCE`. To avoid comparing every pair of raw signals, keys (bands) are derived from the timings
+and only signals sharing a band are compared: the halves of the timings mapped to their levels
+(e.g. the short and long spaces of a pulse distance protocol) and samples of the coarsely quantized timings.
+Bands shared by many signals (e.g. the header and marks of the same protocol) carry no information and are skipped.
+"""
+
+import functools
+import json
+import math
+import operator
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lint import ParsedLine, decode_lines
+from lint_discover import discover_files, read_content
+
+RAW_TOLERANCE = 0.2  # relative
+RAW_TOLERANCE_ABS = 100  # microseconds, for short timings
+# number of bands per quantization and timings per band:
+# a similar signal shares a band with high probability, a different signal only rarely.
+# The timings of a band are every `RAW_BANDS`th timing, an odd number so a band holds marks and spaces
+RAW_BANDS = 7
+RAW_BAND_SIZE = 10
+# timings within this factor of the next shorter timing belong to the same level
+RAW_LEVEL_GAP = 1.3
+RAW_LEVEL_BANDS = 2
+# bands with this many signals are skipped, they are too common to find duplicates
+MAX_BUCKET_SIZE = 16
+# coarse buckets (wider than `RAW_TOLERANCE`), every offset is a separate quantization,
+# so similar timings close to a bucket border still share a bucket in one of them
+QUANTIZE_STEPS_PER_OCTAVE = 2
+QUANTIZE_OFFSETS = (0.0, 0.5)
+# signals shared by more files are considered generic (e.g. NEC power) and
+# are ignored when comparing files
+MAX_GROUP_FILES = 50
+
+
+class Signal:
+    """ Signal holds the values of a single signal of a file
+    """
+
+    def __init__(self, file_path: str, lnr: int, name: str) -> None:
+        self.file_path = file_path
+        self.lnr = lnr
+        self.name = name
+        self.values: Dict[str, str] = {}
+        self.timings: List[int] = []
+
+    def fingerprint(self) -> Optional[tuple]:
+        """ Returns the exact fingerprint of a parsed signal, None for other signals
+        """
+        if self.values.get("type") != "parsed":
+            return None
+        return (
+            self.values.get("protocol"),
+            " ".join(self.values.get("address", "").upper().split()),
+            " ".join(self.values.get("command", "").upper().split()),
+        )
+
+    def is_raw(self) -> bool:
+        return self.values.get("type") == "raw" and len(self.timings) > 0
+
+    def to_obj(self):
+        return {"file": self.file_path, "lnr": self.lnr, "name": self.name}
+
+
+def read_signals(file_path: str, lines: Iterable[str]) -> List[Signal]:
+    """ Reads all signals of a file (uses the same line parsing as the checks)
+    """
+    signals = []
+    signal = None
+    for lnr, line in enumerate(lines, 1):
+        parsed = ParsedLine(line.rstrip("\n"))
+        if parsed.is_comment or parsed.key is None:
+            continue
+        key = parsed.key.strip()
+        if key == "name":
+            signal = Signal(file_path, lnr, parsed.value_stripped)
+            signals.append(signal)
+        elif signal is None:
+            continue
+        elif key == "data":
+            try:
+                signal.timings.extend(abs(int(z)) for z in parsed.value.split())
+            except ValueError:
+                signal.timings = []
+                signal.values["type"] = "invalid"
+        else:
+            signal.values[key] = parsed.value_stripped
+    return signals
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def quantize(timing: int) -> Tuple[int, ...]:
+    """ Maps a timing to a logarithmic bucket for every quantization offset, so similar timings share a bucket
+    """
+    scaled = math.log2(max(timing, 1)) * QUANTIZE_STEPS_PER_OCTAVE
+    return tuple(math.floor(scaled + z) for z in QUANTIZE_OFFSETS)
+
+
+def timing_levels(timings: List[int]) -> List[int]:
+    """ Maps every timing to its level: the index of its cluster of similar timings
+    """
+    levels: Dict[int, int] = {}
+    level = previous = 0
+    for timing in sorted(set(timings)):
+        if previous and timing > previous * RAW_LEVEL_GAP:
+            level += 1
+        levels[timing] = level
+        previous = timing
+    return list(map(levels.__getitem__, timings))
+
+
+def raw_bands(timings: List[int]) -> List[tuple]:
+    """ Returns the LSH keys of raw timings: the `RAW_LEVEL_BANDS` parts of the timing levels
+    and `RAW_BANDS` samples of `RAW_BAND_SIZE` timings (every `RAW_BANDS`th timing) for every quantization offset
+    """
+    count = len(timings)
+    size = min(RAW_BAND_SIZE, count)
+    levels = timing_levels(timings)
+    bands: List[tuple] = []
+    for band in range(RAW_LEVEL_BANDS):
+        start, end = count * band // RAW_LEVEL_BANDS, count * (band + 1) // RAW_LEVEL_BANDS
+        bands.append((count, "levels", band, tuple(levels[start:end])))
+    # repeated, so the samples of short signals wrap around
+    repeat = RAW_BANDS * RAW_BAND_SIZE // count + 2
+    for offset, quantized in zip(QUANTIZE_OFFSETS, zip(*map(quantize, timings))):
+        quantized *= repeat
+        for band in range(min(RAW_BANDS, count)):
+            bands.append((count, offset, band, tuple(quantized[band:band + size * RAW_BANDS:RAW_BANDS])))
+    return bands
+
+
+def raw_bounds(timings: List[int]) -> Tuple[List[float], List[float]]:
+    """ Returns the smallest and the largest similar timing of every timing
+    """
+    # the absolute tolerance is larger for short timings
+    short = RAW_TOLERANCE_ABS / RAW_TOLERANCE
+    return ([z - RAW_TOLERANCE_ABS if z < short else z - RAW_TOLERANCE * z for z in timings],
+            [z + RAW_TOLERANCE_ABS if z < short * (1 - RAW_TOLERANCE) else z / (1 - RAW_TOLERANCE) for z in timings])
+
+
+def raw_similar(bounds: Tuple[List[float], List[float]], timings: List[int]) -> bool:
+    """ Checks if every timing is within the `raw_bounds` of the other signal
+    """
+    lower, upper = bounds
+    return (len(lower) == len(timings) and all(map(operator.le, lower, timings))
+            and all(map(operator.ge, upper, timings)))
+
+
+class DisjointSet:
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        self.parent[self.find(a)] = self.find(b)
+
+
+def find_duplicates(signals: List[Signal]) -> List[List[Signal]]:
+    """ Groups duplicate and near-duplicate signals, returns groups with more than one signal
+    """
+    groups = DisjointSet(len(signals))
+    exact: Dict[tuple, int] = {}
+    buckets: Dict[tuple, List[int]] = {}
+    for index, signal in enumerate(signals):
+        if (fingerprint := signal.fingerprint()) is not None:
+            groups.union(index, exact.setdefault(fingerprint, index))
+        elif signal.is_raw():
+            key = ("raw", signal.values.get("frequency"), tuple(signal.timings))
+            groups.union(index, exact.setdefault(key, index))
+
+            # only compare with the previous raw signals which share at least one band (every pair only once)
+            candidates = set()
+            bands = [z for z in (buckets.setdefault(band, []) for band in raw_bands(signal.timings))
+                     if len(z) < MAX_BUCKET_SIZE]
+            for bucket in bands:
+                candidates.update(bucket)
+            bounds = raw_bounds(signal.timings) if candidates else ([], [])
+            for other in candidates:
+                if groups.find(index) != groups.find(other) and raw_similar(bounds, signals[other].timings):
+                    groups.union(index, other)
+            # a band needs only one signal of a group, so duplicates don't fill it
+            root = groups.find(index)
+            for bucket in bands:
+                if all(groups.find(z) != root for z in bucket):
+                    bucket.append(index)
+
+    result: Dict[int, List[Signal]] = {}
+    for index, signal in enumerate(signals):
+        result.setdefault(groups.find(index), []).append(signal)
+    return [z for z in result.values() if len(z) > 1]
+
+
+def find_duplicate_files(
+        signals: List[Signal], duplicates: List[List[Signal]], threshold: float
+) -> List[Tuple[str, str, float]]:
+    """ Returns (file, other file, ratio) for files where at least `threshold` of the signals
+    also exist in the other file
+    """
+    signal_count: Dict[str, int] = {}
+    for signal in signals:
+        signal_count[signal.file_path] = signal_count.get(signal.file_path, 0) + 1
+
+    shared: Dict[Tuple[str, str], int] = {}
+    for group in duplicates:
+        files = {z.file_path for z in group}
+        if len(files) < 2 or len(files) > MAX_GROUP_FILES:
+            continue
+        for file_path in files:
+            for other in files:
+                if other != file_path:
+                    shared[(file_path, other)] = shared.get((file_path, other), 0) + 1
+
+    result = []
+    for (file_path, other), count in shared.items():
+        ratio = count / signal_count[file_path]
+        if ratio >= threshold:
+            result.append((file_path, other, ratio))
+    result.sort(key=lambda z: (-z[2], z[0], z[1]))
+    return result
+
+
+def analyze(files: Iterable[str], threshold: float = 0.8) -> dict:
+    signals = []
+    for file_path in files:
+        lines, _ = decode_lines(read_content(file_path))
+        signals.extend(read_signals(file_path, lines))
+    duplicates = find_duplicates(signals)
+    return {
+        "signals": len(signals),
+        "duplicates": duplicates,
+        "duplicate_files": find_duplicate_files(signals, duplicates, threshold),
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    as_json = "--json" in args
+    threshold = 0.8
+    file_args = []
+    it = iter(args)
+    for arg in it:
+        if arg == "--json":
+            continue
+        if arg == "--threshold":
+            threshold = float(next(it, threshold))
+        else:
+            file_args.append(arg)
+    files = list(discover_files(file_args))
+    if len(files) <= 0:
+        print("$ python3 lint_corpus.py [--json] [--threshold 0.8] [file_1] [file_2] ... [file_n]")
+        sys.exit(1)
+
+    res = analyze(files, threshold)
+    if as_json:
+        print(json.dumps({
+            "signals": res["signals"],
+            "duplicates": [[z.to_obj() for z in group] for group in res["duplicates"]],
+            "duplicate_files": [
+                {"file": a, "duplicates": b, "ratio": ratio} for a, b, ratio in res["duplicate_files"]
+            ],
+        }, indent=4))
+        return
+
+    for group in res["duplicates"]:
+        print(f"[corpus] {len(group)} duplicates of '{group[0].name}':")
+        for signal in group:
+            print(f"  {signal.file_path}:{signal.lnr} '{signal.name}'")
+    for file_path, other, ratio in res["duplicate_files"]:
+        print(f"[corpus] {ratio:.0%} of the signals of '{file_path}' also exist in '{other}'")
+    print(f"[corpus] {res['signals']} signals, {len(res['duplicates'])} groups of duplicates, "
+          f"{len(res['duplicate_files'])} mostly duplicated files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+""" Git-Diff:
+finds the changed .ir files and their changed lines in the local git repository.
+"""
+
+import bisect
+import codecs
+import os
+import re
+import subprocess
+from typing import Dict, List, Tuple
+
+HUNK_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class ChangedLines:
+    """ Sorted, non-overlapping line ranges (inclusive) which were added or changed in a file
+    """
+
+    def __init__(self, ranges: List[Tuple[int, int]]) -> None:
+        ranges = sorted(ranges)
+        self.starts = [z[0] for z in ranges]
+        self.ends = [z[1] for z in ranges]
+
+    def __contains__(self, lnr: int) -> bool:
+        index = bisect.bisect_right(self.starts, lnr) - 1
+        return index >= 0 and lnr <= self.ends[index]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+def _unquote_path(path: str) -> str:
+    # git quotes paths with special characters: "b/r\303\244w.ir"
+    if path.startswith('"') and path.endswith('"'):
+        path = codecs.escape_decode(path[1:-1].encode())[0].decode("utf-8")
+    return path
+
+
+def _git(*args: str) -> str:
+    res = subprocess.run(["git", *args], capture_output=True, text=True)
+    if res.returncode != 0:
+        raise OSError(res.stderr.strip() or f"git {args[0]} failed")
+    return res.stdout
+
+
+def merge_base(base: str) -> str:
+    """ Returns the commit where HEAD branched off `base`, or `base` if there is none
+    """
+    try:
+        return _git("merge-base", base, "HEAD").strip() or base
+    except OSError:
+        return base
+
+
+def parse_diff(diff: str) -> Dict[str, ChangedLines]:
+    """ Parses a unified diff (with --unified=0 and the default 'a/' and 'b/' prefixes)
+    into the changed line ranges per new file
+    """
+    changed: Dict[str, List[Tuple[int, int]]] = {}
+    ranges = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            path = _unquote_path(line[4:].rstrip("\t"))
+            if path == "/dev/null":
+                ranges = None
+                continue
+            ranges = changed.setdefault(os.path.normpath(path[2:]), [])
+        elif ranges is not None and (res := HUNK_PATTERN.match(line)):
+            start = int(res.group(1))
+            count = 1 if res.group(2) is None else int(res.group(2))
+            # count = 0: lines were only removed
+            if count > 0:
+                ranges.append((start, start + count - 1))
+    return {path: ChangedLines(ranges) for path, ranges in changed.items()}
+
+
+def changed_files(base: str, pathspec: str = "*.ir") -> Dict[str, ChangedLines]:
+    """ Returns the changed line ranges of all files matching `pathspec`
+    which changed between `base` (the merge-base with HEAD) and the working tree
+
+    Paths are relative to the current working directory.
+    """
+    top_level = _git("rev-parse", "--show-toplevel").strip()
+    diff = _git(
+        "-c", "core.quotePath=false", "diff", "--unified=0", "--no-color", "--no-ext-diff",
+        # explicit prefixes, diff.noprefix or diff.mnemonicPrefix would change them
+        "--src-prefix=a/", "--dst-prefix=b/",
+        "--diff-filter=AMR", merge_base(base), "--", f":(top){pathspec}"
+    )
+    return {
+        os.path.relpath(os.path.join(top_level, path)): lines
+        for path, lines in parse_diff(diff).items() if len(lines) > 0
+    }
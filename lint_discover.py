@@ -0,0 +1,153 @@
+""" Discovery:
+expands the file arguments of main.py lazily, so checking can start with the first file found.
+
+supported arguments:
+ - `glob:<pattern>`: files matching the (recursive) glob pattern
+ - `file:<path>`: files listed in a text file (one per line)
+ - `json:<path>`: files listed in a JSON array
+ - `archive:<path>`: .ir files in a zip or tar (optionally compressed) archive, see `ArchiveMember`
+ - `-`: files read from stdin (one per line or NUL-separated), see `read_paths`
+ - directories: all .ir files below the directory (hidden directories and links to directories are skipped)
+ - everything else is a file path
+"""
+
+import json
+import os
+import sys
+from glob import iglob
+from typing import BinaryIO, Iterable, Iterator
+
+# chunk size when reading paths from a stream
+READ_SIZE = 64 * 1024
+
+
+def walk_files(directory: str, suffix: str = ".ir") -> Iterator[str]:
+    """ Yields all files ending with `suffix` below `directory`, sorted by name per directory
+
+    Symbolic links to directories are not followed (like `os.walk`), so links can't create loops.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda z: z.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_files(entry.path, suffix)
+        elif entry.name.endswith(suffix) and entry.is_file():
+            yield entry.path
+
+
+class ArchiveMember(str):
+    """ Path of a file in an archive ('archive!member/path') and its content
+
+    Members are read one at a time while the archive is discovered,
+    `lint_file` uses `data` instead of reading the file.
+    """
+
+    def __new__(cls, archive: str, name: str, data: bytes) -> 'ArchiveMember':
+        member = super().__new__(cls, f"{archive}!{name}")
+        # kept separately, both paths can contain '!'
+        member.archive = archive
+        member.name = name
+        member.data = data
+        return member
+
+    def __reduce__(self):
+        return ArchiveMember, (self.archive, self.name, self.data)
+
+
+def read_content(file: str) -> bytes:
+    """ Returns the content of a file or of an `ArchiveMember`
+    """
+    if isinstance(file, ArchiveMember):
+        return file.data
+    with open(file, "rb") as fd:
+        return fd.read()
+
+
+def is_member_checked(name: str, suffix: str = ".ir") -> bool:
+    """ Returns if the archive member `name` is checked (not hidden and ending with `suffix`)
+
+    '.' components (e.g. './sub/a.ir' of `tar -C dir .`) are not hidden
+    """
+    return name.endswith(suffix) and not any(z.startswith(".") for z in name.split("/") if z != ".")
+
+
+def read_archive(archive: str) -> Iterator[ArchiveMember]:
+    """ Yields the .ir files of a zip or tar archive, only one member is decompressed at a time
+    """
+    import zipfile
+
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and is_member_checked(info.filename):
+                    yield ArchiveMember(archive, info.filename, zf.read(info))
+        return
+
+    import tarfile
+
+    # stream mode: the archive is read (and decompressed) front to back only once
+    with tarfile.open(archive, "r|*") as tf:
+        for info in tf:
+            if info.isfile() and is_member_checked(info.name):
+                yield ArchiveMember(archive, info.name, tf.extractfile(info).read())
+
+
+def read_paths(fd: BinaryIO, separator: bytes = b"\n") -> Iterator[str]:
+    """ Yields the paths of a list separated by `separator` (e.g. b"\0" for `find -print0`)
+
+    Every path is yielded as soon as it was read, so a slow producer doesn't delay the first paths.
+    Line breaks ('\r\n') and empty paths are ignored.
+    """
+    rest = b""
+    while chunk := fd.read1(READ_SIZE):
+        *paths, rest = (rest + chunk).split(separator)
+        for path in paths:
+            if path := path.strip(b"\r\n"):
+                yield os.fsdecode(path)
+    if rest := rest.strip(b"\r\n"):
+        yield os.fsdecode(rest)
+
+
+def expand_argument(arg: str, null_separated: bool = False) -> Iterator[str]:
+    """ Yields the files of a single argument
+    """
+    if arg == "-":
+        yield from read_paths(sys.stdin.buffer, b"\0" if null_separated else b"\n")
+    elif arg.startswith("glob:"):
+        yield from iglob(arg[5:], recursive=True)
+    elif arg.startswith("file:"):
+        with open(arg[5:], "r", encoding='utf-8') as fd:
+            for line in fd:
+                if line := line.strip():
+                    yield line
+    elif arg.startswith("json:"):
+        with open(arg[5:], "r", encoding='utf-8') as fd:
+            yield from (z.strip() for z in json.load(fd) if len(z.strip()) > 0)
+    elif arg.startswith("archive:"):
+        yield from read_archive(arg[8:])
+    elif os.path.isdir(arg):
+        yield from walk_files(arg)
+    else:
+        yield arg
+
+
+def discover_files(args: Iterable[str], null_separated: bool = False) -> Iterator[str]:
+    """ Yields the files of all `args` as soon as they are found
+
+    Files are only yielded once, even if they are found by multiple arguments or by different paths.
+    If `null_separated` is set, the paths read from stdin ('-') are separated by NUL instead of line breaks.
+    """
+    seen = set()
+    for arg in args:
+        for file in expand_argument(arg, null_separated):
+            # only the path of archive members is kept, not their content
+            resolved = str(file) if isinstance(file, ArchiveMember) else os.path.realpath(file)
+            if resolved in seen:
+                continue
+            seen.add(resolved)
+            yield file
@@ -0,0 +1,118 @@
+""" Fix:
+applies the suggestions of the checks in a single pass over a file.
+every line is checked again after a suggestion was applied, until no more suggestions apply,
+then the next line is checked, so the fixed file is clean after one run (except for errors without suggestion).
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Iterable, Iterator, List, Tuple
+
+from lint import FileChecker, Result
+
+# maximum number of suggestions applied to a single line
+MAX_ROUNDS = 10
+
+
+def fix_lines(file_path: str, lines: Iterable[str], on_found=None) -> Iterator[Tuple[str, str]]:
+    """ Fixes `lines` (without line breaks) and yields (line, fixed line)-tuples
+
+    The results which remain for the fixed lines are passed to `on_found`
+    """
+    checker = FileChecker(file_path)
+    autofix = {type(z).__name__: z.autofix for z in checker.checks}
+
+    lines = iter(lines)
+    for lnr, line in enumerate(lines, 1):
+        fixed = line
+        seen = {fixed}
+        for _ in range(MAX_ROUNDS):
+            state = checker.get_state()
+            results = []
+            checker.check_line(lnr, fixed, lambda *args: results.append(args))
+            suggestion = next((
+                z[3].suggestion for z in results
+                if z[3].suggestion is not None and z[3].autofix and autofix[z[3].check]
+            ), None)
+            # stop if nothing applies or the suggestions go in circles
+            if suggestion is None or suggestion in seen:
+                break
+            seen.add(suggestion)
+            checker.set_state(state)
+            fixed = suggestion
+        else:
+            # the last suggestion was applied, but not checked yet
+            results = []
+            checker.check_line(lnr, fixed, lambda *args: results.append(args))
+
+        if on_found is not None:
+            for result in results:
+                on_found(*result)
+        yield line, fixed
+
+        # the checks were canceled for all other lines (EXIT_ALL_LINES)
+        if checker.stopped:
+            for rest in lines:
+                yield rest, rest
+
+
+def fix_file(file: str, dry_run: bool = False) -> Tuple[List[Tuple[int, str, Result]], List[str]]:
+    """ Fixes a single file and replaces it atomically (if anything changed)
+
+    Returns the remaining results as (lnr, line, result)-tuples (same as `main.lint_file`)
+    and, if `dry_run` is set, a unified diff instead of writing the file
+    """
+    results = []
+
+    def collect(_: str, lnr: int, line: str, result: Result):
+        results.append((lnr, line, result))
+
+    # the line breaks of the file are kept
+    line_breaks = []
+
+    def read_lines(fd):
+        for raw_line in fd:
+            line = raw_line.rstrip("\r\n")
+            line_breaks.append(raw_line[len(line):])
+            yield line
+
+    changed = False
+
+    if dry_run:
+        original, fixed = [], []
+        with open(file, "r", encoding="UTF-8", errors="replace", newline="") as fd:
+            for line, fixed_line in fix_lines(file, read_lines(fd), collect):
+                line_break = line_breaks.pop()
+                original.append(line + line_break)
+                fixed.append(fixed_line + line_break)
+                changed = changed or line != fixed_line
+        if not changed:
+            return results, []
+
+        from difflib import unified_diff  # only imported if a diff is needed
+        label = file.lstrip("/")
+        diff = []
+        for diff_line in unified_diff(original, fixed, f"a/{label}", f"b/{label}"):
+            if not diff_line.endswith("\n"):
+                diff_line += "\n\\ No newline at end of file\n"
+            diff.append(diff_line)
+        return results, diff
+
+    # write to a temporary file next to `file`, which then replaces `file`
+    directory = os.path.dirname(os.path.abspath(file))
+    out = tempfile.NamedTemporaryFile(
+        "w", encoding="UTF-8", newline="", dir=directory, prefix=".lint-fix-", delete=False
+    )
+    try:
+        with out, open(file, "r", encoding="UTF-8", errors="replace", newline="") as fd:
+            for line, fixed_line in fix_lines(file, read_lines(fd), collect):
+                out.write(fixed_line + line_breaks.pop())
+                changed = changed or line != fixed_line
+        if changed:
+            shutil.copymode(file, out.name)
+            os.replace(out.name, file)
+    finally:
+        if os.path.exists(out.name):
+            os.unlink(out.name)
+    return results, []
@@ -24,6 +24,8 @@ class JsonFormat:
         obj = [z.to_obj() for z in results]
         for res in obj:
             res.pop("file")
+            # the check name isn't part of the json format (only of ndjson, sarif, the cache and the server)
+            res["result"].pop("check", None)
         self.files[file_path].extend(obj)
 
     def all_done_callback(self, _: ErrorCounter) -> None:
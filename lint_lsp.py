@@ -0,0 +1,256 @@
+""" Language Server:
+publishes the lint results as diagnostics while editing .ir files.
+
+$ python3 lint_lsp.py
+
+Communicates via stdin/stdout (Language Server Protocol).
+The suggestions of the results are offered as quick fixes.
+After a change, only the lines from the first changed line on are checked again (see `DocumentChecker`).
+"""
+
+import json
+import sys
+import threading
+from typing import BinaryIO, List, Optional
+from urllib.parse import unquote, urlparse
+
+from lint import FileChecker, Result
+
+# delay after the last change before a document is checked
+DEBOUNCE_DELAY = 0.05
+# number of lines between two snapshots of the check state of a document
+SNAPSHOT_INTERVAL = 32
+
+SEVERITY_WARNING = 2
+TEXT_DOCUMENT_SYNC_FULL = 1
+
+
+def read_message(stream: BinaryIO) -> Optional[dict]:
+    """ Reads a single JSON-RPC message, returns None if the stream was closed
+    """
+    content_length = None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            break
+        name, _, value = header.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            content_length = int(value)
+    if content_length is None:
+        return None
+    return json.loads(stream.read(content_length))
+
+
+def uri_to_path(uri: str) -> str:
+    """ 'file:///home/remote%201.ir' => '/home/remote 1.ir' (needed for the name-check config)
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        return uri
+    return unquote(parsed.path)
+
+
+def utf16_offset(line: str, index: int) -> int:
+    """ LSP positions count UTF-16 code units, not characters
+    """
+    if line.isascii():
+        return index
+    return len(line[:index].encode("utf-16-le")) // 2
+
+
+def create_diagnostics(lnr: int, line: str, result: Result) -> list:
+    """ Creates one diagnostic per ErrorIndicator of `result`
+    """
+    diagnostics = []
+    for indicator in result.indicators or []:
+        diagnostics.append({
+            "range": {
+                "start": {"line": lnr - 1, "character": utf16_offset(line, indicator.start)},
+                "end": {"line": lnr - 1, "character": utf16_offset(line, max(indicator.end, indicator.start))},
+            },
+            "severity": SEVERITY_WARNING,
+            "source": "fff-ir-lint",
+            "code": result.check,
+            "message": result.error,
+            "data": {"suggestion": result.suggestion, "line": line},
+        })
+    return diagnostics
+
+
+class DocumentChecker:
+    """ Checks a document incrementally
+
+    The state of the checks is kept every `SNAPSHOT_INTERVAL` lines, so after a change
+    the check resumes shortly before the first changed line instead of the start of the document.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.checker = FileChecker(file_path)
+        self.lines: List[str] = []
+        # state of the checks before every `SNAPSHOT_INTERVAL`th line
+        self.states: List[tuple] = []
+        # diagnostics of each checked line
+        self.diagnostics: List[list] = []
+
+    def check(self, lines: List[str]) -> list:
+        """ Checks `lines` (the whole document) and returns the diagnostics of all lines
+        """
+        start, limit = 0, min(len(self.lines), len(lines))
+        while start < limit and self.lines[start] == lines[start]:
+            start += 1
+        # lines after a canceled check (EXIT_ALL_LINES) were never checked
+        start = min(start, len(self.diagnostics))
+
+        snapshot = start // SNAPSHOT_INTERVAL
+        if snapshot < len(self.states):
+            self.checker.set_state(self.states[snapshot])
+            start = snapshot * SNAPSHOT_INTERVAL
+            del self.states[snapshot:]
+            del self.diagnostics[start:]
+        self.lines = lines
+
+        for index in range(start, len(lines)):
+            if self.checker.stopped:
+                break
+            if index % SNAPSHOT_INTERVAL == 0:
+                self.states.append(self.checker.get_state())
+            line_diagnostics = []
+
+            def collect(_: str, lnr: int, line: str, result: Result):
+                line_diagnostics.extend(create_diagnostics(lnr, line, result))
+
+            self.checker.check_line(index + 1, lines[index], collect)
+            self.diagnostics.append(line_diagnostics)
+
+        return [z for line_diagnostics in self.diagnostics for z in line_diagnostics]
+
+
+class LanguageServer:
+    """ Minimal Language Server which checks documents after they have been changed
+    """
+
+    def __init__(self, output: BinaryIO) -> None:
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.documents = {}  # uri => (version, text)
+        self.timers = {}  # uri => pending check
+        self.checkers = {}  # uri => DocumentChecker
+        # checks of the same document can overlap (a timer fires while the previous check still runs)
+        self.check_lock = threading.Lock()
+        self.running = True
+
+    def send(self, message: dict) -> None:
+        body = json.dumps(message).encode()
+        with self.output_lock:
+            self.output.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            self.output.flush()
+
+    def respond(self, request_id, result) -> None:
+        self.send({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def notify(self, method: str, params: dict) -> None:
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def check_document(self, uri: str, version: int) -> None:
+        """ Checks the document and publishes the diagnostics if it didn't change in the meantime
+        """
+        if (document := self.documents.get(uri)) is None or document[0] != version:
+            return
+        with self.check_lock:
+            if (checker := self.checkers.get(uri)) is None:
+                checker = self.checkers[uri] = DocumentChecker(uri_to_path(uri))
+            diagnostics = checker.check(document[1].splitlines())
+        if self.documents.get(uri, (None,))[0] == version:
+            self.notify("textDocument/publishDiagnostics", {
+                "uri": uri, "version": version, "diagnostics": diagnostics
+            })
+
+    def schedule_check(self, uri: str, version: int, delay: float = DEBOUNCE_DELAY) -> None:
+        """ (Re-)Starts the debounce timer of the document
+        """
+        if (timer := self.timers.pop(uri, None)) is not None:
+            timer.cancel()
+        timer = threading.Timer(delay, self.check_document, (uri, version))
+        timer.daemon = True
+        self.timers[uri] = timer
+        timer.start()
+
+    def code_actions(self, params: dict) -> list:
+        """ Returns a quick fix for every diagnostic with a suggestion
+        """
+        uri = params["textDocument"]["uri"]
+        actions = []
+        for diagnostic in params.get("context", {}).get("diagnostics", []):
+            data = diagnostic.get("data") or {}
+            if diagnostic.get("source") != "fff-ir-lint" or data.get("suggestion") is None:
+                continue
+            lnr = diagnostic["range"]["start"]["line"]
+            actions.append({
+                "title": f"Replace with '{data['suggestion']}'",
+                "kind": "quickfix",
+                "diagnostics": [diagnostic],
+                "edit": {"changes": {uri: [{
+                    "range": {
+                        "start": {"line": lnr, "character": 0},
+                        "end": {"line": lnr, "character": utf16_offset(data["line"], len(data["line"]))},
+                    },
+                    "newText": data["suggestion"],
+                }]}},
+            })
+        return actions
+
+    def handle(self, message: dict) -> None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        request_id = message.get("id")
+
+        if method == "initialize":
+            self.respond(request_id, {
+                "capabilities": {
+                    "textDocumentSync": {"openClose": True, "change": TEXT_DOCUMENT_SYNC_FULL},
+                    "codeActionProvider": {"codeActionKinds": ["quickfix"]},
+                },
+                "serverInfo": {"name": "fff-ir-lint"},
+            })
+        elif method == "textDocument/didOpen":
+            document = params["textDocument"]
+            self.documents[document["uri"]] = (document.get("version", 0), document["text"])
+            self.schedule_check(document["uri"], document.get("version", 0), delay=0)
+        elif method == "textDocument/didChange":
+            uri, version = params["textDocument"]["uri"], params["textDocument"].get("version", 0)
+            # full sync: the last change contains the whole document
+            self.documents[uri] = (version, params["contentChanges"][-1]["text"])
+            self.schedule_check(uri, version)
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            self.documents.pop(uri, None)
+            with self.check_lock:
+                self.checkers.pop(uri, None)
+            if (timer := self.timers.pop(uri, None)) is not None:
+                timer.cancel()
+            self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+        elif method == "textDocument/codeAction":
+            self.respond(request_id, self.code_actions(params))
+        elif method == "shutdown":
+            self.respond(request_id, None)
+        elif method == "exit":
+            self.running = False
+        elif request_id is not None:
+            # unknown request
+            self.send({"jsonrpc": "2.0", "id": request_id,
+                       "error": {"code": -32601, "message": f"method '{method}' not found"}})
+
+    def serve(self, stream: BinaryIO) -> None:
+        while self.running and (message := read_message(stream)) is not None:
+            self.handle(message)
+
+
+def main():
+    LanguageServer(sys.stdout.buffer).serve(sys.stdin.buffer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+""" Produces newline-delimited JSON (one result per line)
+"""
+
+import json
+import sys
+
+from lint import Result, ErrorCounter
+
+
+def result_ndjson_output():
+    """ NDJSON callback
+
+    Every result is written as soon as it is found and not kept in memory,
+    the output is flushed after each file so it can be consumed incrementally
+    """
+
+    def result(file_path: str, lnr: int, line: str, result: Result) -> None:
+        sys.stdout.write(json.dumps({
+            "file": file_path,
+            "lnr": lnr,
+            "line": line,
+            "result": result.to_obj(),
+        }) + "\n")
+
+    def file_done(_: str, __: ErrorCounter) -> None:
+        sys.stdout.flush()
+
+    return {
+        "result": result,
+        "file_done": file_done,
+    }
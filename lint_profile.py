@@ -0,0 +1,133 @@
+""" Profiler:
+records how much time is spent in each check, reading files and in the format callbacks.
+only used if `--profile` is specified, otherwise nothing is wrapped.
+"""
+
+import json
+import sys
+import time
+from typing import Callable, TextIO
+
+from lint import Check, Result
+from lint_discover import read_content
+from lint import EXIT_NONE, EXIT_CURRENT_LINE, EXIT_ALL_LINES, EXIT_CURRENT_CHECK_FOR_ALL_LINES
+
+EXIT_RULE_NAMES = {
+    -1: "default",
+    EXIT_NONE: "none",
+    EXIT_CURRENT_LINE: "current_line",
+    EXIT_ALL_LINES: "all_lines",
+    EXIT_CURRENT_CHECK_FOR_ALL_LINES: "current_check_for_all_lines",
+}
+
+
+class CheckStats:
+    """ Statistics of a single check class
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.hits = 0
+        self.exit_rules = {}
+
+    def add(self, duration: float, result: Result) -> None:
+        self.calls += 1
+        self.total_time += duration
+        if duration > self.max_time:
+            self.max_time = duration
+        if isinstance(result, Result):
+            self.hits += 1
+            exit_rule = EXIT_RULE_NAMES.get(result.exit_rule, str(result.exit_rule))
+            self.exit_rules[exit_rule] = self.exit_rules.get(exit_rule, 0) + 1
+
+    def merge(self, other: 'CheckStats') -> None:
+        self.calls += other.calls
+        self.total_time += other.total_time
+        self.max_time = max(self.max_time, other.max_time)
+        self.hits += other.hits
+        for exit_rule, count in other.exit_rules.items():
+            self.exit_rules[exit_rule] = self.exit_rules.get(exit_rule, 0) + count
+
+    def to_obj(self):
+        return {
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "hits": self.hits,
+            "exit_rules": self.exit_rules,
+        }
+
+
+class Profiler:
+    """ Profiler collects CheckStats per check class and the time spent on I/O and callbacks
+    """
+
+    def __init__(self) -> None:
+        self.checks = {}
+        self.io_time = 0.0
+        self.callback_time = 0.0
+
+    def wrap_check(self, check: Check) -> None:
+        """ Replaces the `check` method of `check` with a method which records its duration
+        """
+        stats = self.checks.setdefault(type(check).__name__, CheckStats())
+        run_check = check.check
+
+        def timed_check(*args):
+            start = time.perf_counter()
+            result = run_check(*args)
+            stats.add(time.perf_counter() - start, result)
+            return result
+
+        check.check = timed_check
+
+    def read_content(self, file: str) -> bytes:
+        """ Reads a file (see `lint_discover.read_content`) and records the time spent reading it
+        """
+        start = time.perf_counter()
+        try:
+            return read_content(file)
+        finally:
+            self.io_time += time.perf_counter() - start
+
+    def wrap_callback(self, callback: Callable) -> Callable:
+        """ Returns a callback which records the time spent in `callback`
+        """
+        def timed_callback(*args):
+            start = time.perf_counter()
+            callback(*args)
+            self.callback_time += time.perf_counter() - start
+
+        return timed_callback
+
+    def merge(self, other: 'Profiler') -> None:
+        """ Adds the statistics of `other`, e.g. from a worker process
+        """
+        for name, stats in other.checks.items():
+            self.checks.setdefault(name, CheckStats()).merge(stats)
+        self.io_time += other.io_time
+        self.callback_time += other.callback_time
+
+    def to_obj(self):
+        return {
+            "checks": {name: stats.to_obj() for name, stats in self.checks.items()},
+            "io_time": self.io_time,
+            "callback_time": self.callback_time,
+        }
+
+    def print_table(self, file: TextIO = sys.stderr) -> None:
+        """ Prints the statistics as table, sorted by total time
+        """
+        print(f"{'check':<24} {'calls':>9} {'total ms':>10} {'max ms':>8} {'hits':>7}  exit rules", file=file)
+        for name, stats in sorted(self.checks.items(), key=lambda z: z[1].total_time, reverse=True):
+            exit_rules = ", ".join(f"{k}: {v}" for k, v in stats.exit_rules.items())
+            print(f"{name:<24} {stats.calls:>9} {stats.total_time * 1000:>10.2f} "
+                  f"{stats.max_time * 1000:>8.3f} {stats.hits:>7}  {exit_rules}", file=file)
+        print(f"[profile] reading files: {self.io_time * 1000:.2f} ms, "
+              f"format callbacks: {self.callback_time * 1000:.2f} ms", file=file)
+
+    def write_json(self, file_path: str) -> None:
+        with open(file_path, "w", encoding='UTF-8') as fd:
+            json.dump(self.to_obj(), fd, indent=4)
@@ -0,0 +1,100 @@
+""" Produces SARIF 2.1.0 output (e.g. for GitHub Code Scanning)
+"""
+
+import json
+import sys
+
+from lint import Result, ErrorCounter, VERSION
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+class SarifFormat:
+    """ SARIF Format
+
+    The document is written while linting: every result is written as soon as it is found,
+    the tool description (including the rules seen so far) is written after the last result.
+    Only the set of rule ids is kept in memory.
+    """
+
+    def __init__(self) -> None:
+        self.rules = {}
+        self.result_count = 0
+
+    def _write_header(self) -> None:
+        sys.stdout.write('{"version": "2.1.0", "$schema": "%s", "runs": [{"results": [\n' % SARIF_SCHEMA)
+
+    @staticmethod
+    def _region(lnr: int, start: int, end: int) -> dict:
+        # SARIF columns are 1-based
+        return {"startLine": lnr, "startColumn": start + 1, "endColumn": end + 1}
+
+    def result_callback(self, file_path: str, lnr: int, line: str, result: Result) -> None:
+        """ Lint callback for every result
+        """
+        rule_id = result.check or "lint"
+        self.rules.setdefault(rule_id, result.error)
+
+        uri = file_path.replace("\\", "/")
+        regions = [self._region(lnr, z.start, z.end) for z in result.indicators] \
+            or [self._region(lnr, 0, len(line))]
+        obj = {
+            "ruleId": rule_id,
+            "level": "warning",
+            "message": {"text": result.error},
+            "locations": [
+                {"physicalLocation": {"artifactLocation": {"uri": uri}, "region": region}}
+                for region in regions
+            ],
+        }
+        if result.suggestion is not None:
+            obj["fixes"] = [{
+                "description": {"text": f"replace line with '{result.suggestion}'"},
+                "artifactChanges": [{
+                    "artifactLocation": {"uri": uri},
+                    "replacements": [{
+                        "deletedRegion": self._region(lnr, 0, len(line)),
+                        "insertedContent": {"text": result.suggestion},
+                    }],
+                }],
+            }]
+
+        if self.result_count == 0:
+            self._write_header()
+        else:
+            sys.stdout.write(",\n")
+        sys.stdout.write(json.dumps(obj))
+        self.result_count += 1
+
+    def file_done_callback(self, _: str, __: ErrorCounter) -> None:
+        """ Lint callback after file has been processed
+        """
+        sys.stdout.flush()
+
+    def all_done_callback(self, _: ErrorCounter) -> None:
+        """ Lint callback after all files have been processed
+        """
+        if self.result_count == 0:
+            self._write_header()
+        tool = {
+            "driver": {
+                "name": "fff-ir-lint",
+                "version": VERSION,
+                "informationUri": "https://github.com/darmiel/fff-ir-lint",
+                "rules": [
+                    {"id": rule_id, "shortDescription": {"text": description}}
+                    for rule_id, description in self.rules.items()
+                ],
+            }
+        }
+        sys.stdout.write('\n], "tool": %s}]}\n' % json.dumps(tool))
+        sys.stdout.flush()
+
+
+def result_sarif_output():
+    fmt = SarifFormat()
+    return {
+        "result": fmt.result_callback,
+        "file_done": fmt.file_done_callback,
+        "all_done": fmt.all_done_callback,
+    }
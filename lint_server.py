@@ -0,0 +1,144 @@
+""" Lint-Server:
+keeps the linter (and the compiled config) loaded and checks files on request.
+
+$ python3 lint_server.py [socket]
+$ python3 main.py <format> --server [socket] file_1.ir ... file_n.ir
+
+Protocol: one JSON object per line over a Unix socket.
+Request:  {"cwd": "/path", "files": [{"path": "a.ir"}, {"path": "b.ir", "content": "Filetype: ..."}]}
+          if "content" is given, the file is not read from disk
+Response: {"results": {"a.ir": [{"lnr": 1, "line": "...", "result": {...}}, ...], "b.ir": []}}
+          (the same results the `json` format produces, but files without results are included)
+          or {"error": "..."}
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from typing import Iterator, List, Tuple
+
+import lint
+from config import load_config
+from lint import Result, check_file, decode_lines
+
+DEFAULT_SOCKET = os.path.join(
+    os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"fff-ir-lint-{os.getuid()}.sock"
+)
+
+
+class ConfigWatcher:
+    """ Reloads the `LINTER_CONFIG` if the config file has changed
+    """
+
+    def __init__(self) -> None:
+        self.config_file = os.getenv("LINTER_CONFIG")
+        self.mtime = self._mtime()
+        self.lock = threading.Lock()
+
+    def _mtime(self) -> float:
+        if not self.config_file:
+            return 0
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return 0
+
+    def update(self) -> None:
+        if not self.config_file:
+            return
+        with self.lock:
+            if (mtime := self._mtime()) == self.mtime:
+                return
+            try:
+                lint.set_config(load_config(self.config_file))
+                print(f"[server] reloaded config '{self.config_file}'")
+            except (OSError, ValueError) as err:
+                print(f"[server] cannot reload config '{self.config_file}': {err}")
+            self.mtime = mtime
+
+
+def lint_request(request: dict) -> dict:
+    """ Checks all files of `request` and returns the response
+    """
+    cwd = request.get("cwd", "")
+    response = {}
+    for file in request.get("files", []):
+        file_path = file["path"]
+        results = response.setdefault(file_path, [])
+
+        def collect(_: str, lnr: int, line: str, result: Result):
+            results.append({"lnr": lnr, "line": line, "result": result.to_obj()})
+
+        if (content := file.get("content")) is not None:
+            check_file(file_path, content.splitlines(), collect)
+        else:
+            with open(os.path.join(cwd, file_path), "rb") as fd:
+                lines, ascii_only = decode_lines(fd.read())
+            check_file(file_path, lines, collect, ascii_only=ascii_only)
+    return {"results": response}
+
+
+class LintRequestHandler(socketserver.StreamRequestHandler):
+    """ Handles one request per line until the client closes the connection
+    """
+
+    def handle(self) -> None:
+        for request_line in self.rfile:
+            self.server.config_watcher.update()
+            try:
+                response = lint_request(json.loads(request_line))
+            except (OSError, ValueError, KeyError, TypeError) as err:
+                response = {"error": str(err)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class LintServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str) -> None:
+        # remove stale socket of a previous server
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, LintRequestHandler)
+        self.config_watcher = ConfigWatcher()
+
+
+def request_results(socket_path: str, files: List[str]) -> Iterator[List[Tuple[int, str, Result]]]:
+    """ Sends `files` to the server listening on `socket_path`
+
+    Yields the results per file as (lnr, line, result)-tuples in the order of `files`
+    """
+    request = {"cwd": os.getcwd(), "files": [{"path": z} for z in files]}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as fd:
+            response = json.loads(fd.readline())
+    if "error" in response:
+        raise OSError(f"server error: {response['error']}")
+    results = response["results"]
+    for file in files:
+        yield [(z["lnr"], z["line"], Result.from_obj(z["result"])) for z in results[file]]
+
+
+def main():
+    socket_path = sys.argv[1] if len(sys.argv) >= 2 else DEFAULT_SOCKET
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with LintServer(socket_path) as server:
+        print(f"[server] listening on '{socket_path}'")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    main()
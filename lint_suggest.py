@@ -0,0 +1,97 @@
+""" Suggestions:
+finds the closest words of a vocabulary (e.g. the valid keys or protocols) for a misspelled word.
+the results of `difflib.get_close_matches` are kept in a bounded LRU cache,
+so a typo repeated in many lines is only looked up once
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class Vocabulary:
+    """ Words to suggest
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self.words = tuple(dict.fromkeys(words))
+
+    def close_matches(self, word: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        from difflib import get_close_matches  # only imported if a suggestion is needed
+        # every word is compared: a word can be close without sharing a bigram (e.g. "ynpmeq" and "type")
+        return get_close_matches(word, self.words, n, cutoff)
+
+
+class SuggestionEngine:
+    """ Named vocabularies and a LRU cache of (vocabulary, word) -> close matches
+
+    a vocabulary is either registered with its words or with a provider,
+    which is only called when the vocabulary is used for the first time.
+    the engine is shared by all threads (e.g. of lint_server.py and lint_lsp.py), so the cache is locked.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.cache_size = cache_size
+        self.cache: OrderedDict[Tuple[str, str], Tuple[str, ...]] = OrderedDict()
+        self.vocabularies: Dict[str, Vocabulary] = {}
+        self.providers: Dict[str, Callable[[], Iterable[str]]] = {}
+        self.lock = threading.Lock()
+
+    def register(self, name: str, words: Iterable[str]) -> None:
+        """ Registers (or replaces) the vocabulary `name`, does nothing if the words did not change
+        """
+        words = tuple(dict.fromkeys(words))
+        with self.lock:
+            if (vocabulary := self.vocabularies.get(name)) is not None and vocabulary.words == words:
+                return
+            self.providers.pop(name, None)
+            self.vocabularies[name] = Vocabulary(words)
+            self._invalidate(name)
+
+    def register_provider(self, name: str, provider: Callable[[], Iterable[str]]) -> None:
+        """ Registers (or replaces) the vocabulary `name`, the words are read from `provider` on first use
+        """
+        with self.lock:
+            self.vocabularies.pop(name, None)
+            self.providers[name] = provider
+            self._invalidate(name)
+
+    def _invalidate(self, name: str) -> None:
+        for key in [z for z in self.cache if z[0] == name]:
+            del self.cache[key]
+
+    def vocabulary(self, name: str) -> Vocabulary:
+        with self.lock:
+            return self._vocabulary(name)
+
+    def _vocabulary(self, name: str) -> Vocabulary:
+        if (vocabulary := self.vocabularies.get(name)) is None:
+            if (provider := self.providers.pop(name, None)) is None:
+                raise KeyError(f"unknown vocabulary '{name}'")
+            vocabulary = self.vocabularies[name] = Vocabulary(provider())
+        return vocabulary
+
+    def close_matches(self, name: str, word: str) -> Tuple[str, ...]:
+        """ Returns the (up to 3) closest words of the vocabulary `name`, best match first
+        """
+        key = (name, word)
+        with self.lock:
+            if (matches := self.cache.get(key)) is not None:
+                self.cache.move_to_end(key)
+                return matches
+            vocabulary = self._vocabulary(name)
+        # vocabularies are not changed after they were created, so the lock isn't needed for the lookup
+        matches = tuple(vocabulary.close_matches(word))
+        with self.lock:
+            self.cache[key] = matches
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return matches
+
+    def suggest(self, name: str, word: str) -> Optional[str]:
+        """ Returns the closest word of the vocabulary `name` or None
+        """
+        matches = self.close_matches(name, word)
+        return matches[0] if matches else None
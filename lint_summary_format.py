@@ -0,0 +1,131 @@
+""" Produces a summary of all results instead of the results itself:
+the number of results per check, per message template, per directory and the files with the most results.
+only counters are kept, no results or lines.
+"""
+
+import heapq
+import json
+import os
+import re
+
+from lint import Result, ErrorCounter
+
+# number of files with the most results
+TOP_FILES = 10
+
+# quoted values and numbers are replaced in the messages (but not e.g. 'UTF-8' or '1.0')
+_quoted_pattern = re.compile(r"'[^']*'")
+_number_pattern = re.compile(r"(?<![\w.-])\d+(?![\w.])")
+
+
+def message_template(message: str) -> str:
+    """ Returns `message` without the values which differ per result, e.g.
+    "key 'nme' unknown" -> "key '…' unknown"
+    """
+    return _number_pattern.sub("#", _quoted_pattern.sub("'…'", message))
+
+
+class Summary:
+    """ Counters of all results
+    """
+
+    def __init__(self, top_files: int = TOP_FILES) -> None:
+        self.files = 0
+        self.files_with_results = 0
+        self.total = 0
+        self.checks: dict[str, int] = {}
+        self.messages: dict[str, int] = {}
+        # directory -> check -> count
+        self.directories: dict[str, dict[str, int]] = {}
+        # (count, file)-min-heap of the files with the most results
+        self.top_files_count = top_files
+        self.top_files: list[tuple[int, str]] = []
+
+    def add(self, file_path: str, result: Result) -> None:
+        self.total += 1
+        check = result.check or "unknown"
+        self.checks[check] = self.checks.get(check, 0) + 1
+        template = message_template(result.error)
+        self.messages[template] = self.messages.get(template, 0) + 1
+        directory = self.directories.setdefault(os.path.dirname(file_path), {})
+        directory[check] = directory.get(check, 0) + 1
+
+    def file_done(self, file_path: str, count: int) -> None:
+        self.files += 1
+        if count <= 0:
+            return
+        self.files_with_results += 1
+        if len(self.top_files) < self.top_files_count:
+            heapq.heappush(self.top_files, (count, file_path))
+        elif count > self.top_files[0][0]:
+            heapq.heapreplace(self.top_files, (count, file_path))
+
+    def to_obj(self):
+        def by_count(counts: dict) -> dict:
+            return dict(sorted(counts.items(), key=lambda z: (-z[1], z[0])))
+
+        return {
+            "files": self.files,
+            "files_with_results": self.files_with_results,
+            "results": self.total,
+            "checks": by_count(self.checks),
+            "messages": by_count(self.messages),
+            "directories": {
+                directory: {"results": sum(checks.values()), "checks": by_count(checks)}
+                for directory, checks in sorted(
+                    self.directories.items(), key=lambda z: (-sum(z[1].values()), z[0])
+                )
+            },
+            "top_files": [{"file": file, "results": count} for count, file in sorted(
+                self.top_files, key=lambda z: (-z[0], z[1])
+            )],
+        }
+
+    def print_table(self) -> None:
+        obj = self.to_obj()
+        print(f"[lint] {obj['results']} results in {obj['files_with_results']}/{obj['files']} files")
+
+        def table(title: str, rows: list) -> None:
+            if len(rows) <= 0:
+                return
+            width = max(len(str(z[1])) for z in rows)
+            print()
+            print(title)
+            for name, count in rows:
+                print(f"  {count:>{width}}  {name}")
+
+        table("per check:", [(k, v) for k, v in obj["checks"].items()])
+        table("per message:", [(k, v) for k, v in obj["messages"].items()])
+        table("per directory:", [(k or ".", v["results"]) for k, v in obj["directories"].items()])
+        table("files with most results:", [(z["file"], z["results"]) for z in obj["top_files"]])
+
+
+def _summary_callbacks(summary: Summary, done) -> dict:
+    def result(file_path: str, _: int, __: str, res: Result) -> None:
+        summary.add(file_path, res)
+
+    def file_done(file_path: str, error_counter: ErrorCounter) -> None:
+        summary.file_done(file_path, error_counter.file_count)
+
+    def all_done(_: ErrorCounter) -> None:
+        done()
+
+    return {
+        "result": result,
+        "file_done": file_done,
+        "all_done": all_done,
+    }
+
+
+def result_summary_output():
+    """ Summary callback (table)
+    """
+    summary = Summary()
+    return _summary_callbacks(summary, summary.print_table)
+
+
+def result_summary_json_output():
+    """ Summary callback (JSON)
+    """
+    summary = Summary()
+    return _summary_callbacks(summary, lambda: print(json.dumps(summary.to_obj(), indent=4)))
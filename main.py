@@ -1,24 +1,54 @@
 """ $ python3 main.py github file_1.ir file_2.ir file_3.ir ... file_n.ir
 """
 
+import hashlib
+import importlib
+import os
 import sys
-import json
+from typing import Iterable, List, Optional, Tuple
 
-from lint import check_file
-from lint import ErrorCounter, Result
+from lint import check_file, decode_lines
+from lint import ErrorCounter, NameIndex, Result
+from lint_discover import ArchiveMember, discover_files, read_content
+from lint_cache import ResultCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES
+from lint_profile import Profiler
 
-from lint_simple_format import result_simple_output
-from lint_github_format import result_github_output
-from lint_github_2_format import result_github_2_output
-from lint_json_format import result_json_output
+# formats are only imported when used (see `load_format`)
+FORMATS = {
+    "simple": "lint_simple_format.result_simple_output",
+    "github": "lint_github_format.result_github_output",
+    "github2": "lint_github_2_format.result_github_2_output",
+    "json": "lint_json_format.result_json_output",
+    "ndjson": "lint_ndjson_format.result_ndjson_output",
+    "sarif": "lint_sarif_format.result_sarif_output",
+    "summary": "lint_summary_format.result_summary_output",
+    "summary-json": "lint_summary_format.result_summary_json_output",
+}
 
-from glob import glob
+# options which expect a value, e.g. '--jobs 4' or '--jobs=4'
+VALUE_OPTIONS = {
+    "--jobs": "number of worker processes (0 = number of CPUs)",
+    "--cache-dir": f"directory of the result cache (default: {DEFAULT_CACHE_DIR})",
+    "--cache-size": f"maximum number of files in the result cache (default: {DEFAULT_MAX_ENTRIES})",
+    "--profile-output": "write the profile (see '--profile') as JSON to this file",
+    "--server": "send the files to a running lint_server.py (socket, '-' = default socket)",
+    "--diff": "only check .ir files changed since this git revision and only report changed lines",
+    "--max-errors-per-file": "stop checking a file after this number of results",
+    "--max-errors": "stop checking after this number of results (in total)",
+    "--checkpoint": "append the results of every checked file to this file (see '--resume')",
+}
 
-FORMATS = {
-    "simple": result_simple_output,
-    "github": result_github_output,
-    "github2": result_github_2_output,
-    "json": result_json_output,
+# options without a value, e.g. '--no-cache'
+FLAG_OPTIONS = {
+    "--no-cache": "don't read or write the result cache",
+    "--profile": "print time spent per check, reading files and in format callbacks (disables the cache)",
+    "--cross-file-names": "report signal names used in sibling files (disables the cache and '--jobs')",
+    "--fix": "apply the suggestions and write the fixed files, remaining results are reported "
+             "(disables the cache and '--jobs')",
+    "--dry-run": "with '--fix': print a unified diff instead of writing the files",
+    "--fail-fast": "stop checking after the first file with results",
+    "--resume": "don't check the files of the '--checkpoint' again (unless changed), replay their results instead",
+    "--null": "the files read from stdin are NUL-separated (e.g. 'find -print0'), implies '-' if no files are given",
 }
 
 
@@ -28,68 +58,367 @@ def unused(*args):
     _ = args
 
 
+def load_format(name: str) -> dict:
+    """ Imports the format `name` and returns its callbacks
+    """
+    module, _, function = FORMATS[name].rpartition(".")
+    return getattr(importlib.import_module(module), function)()
+
+
+def print_usage():
+    """ Prints the syntax, available formats and options
+    """
+    print("$ python3 main.py <format> [options] [file_1] [file_2] ... [file_n]")
+    print(f"Formats: {', '.join(FORMATS.keys())}")
+    print("Options:")
+    for option, description in VALUE_OPTIONS.items():
+        print(f"  {option} <value>: {description}")
+    for option, description in FLAG_OPTIONS.items():
+        print(f"  {option}: {description}")
+
+
+def parse_options(args: List[str]) -> Tuple[dict, List[str]]:
+    """ Splits `args` into options and positional arguments
+
+    Returns a dict of options (without leading '--') and a list of the remaining arguments
+    """
+    options = {}
+    positional = []
+    it = iter(args)
+    for arg in it:
+        option, _, value = arg.partition("=")
+        if option in VALUE_OPTIONS:
+            if not value:
+                value = next(it, None)
+            if value is None:
+                print(f"error: option '{option}' expects a value")
+                sys.exit(1)
+            options[option[2:]] = value
+        elif arg in FLAG_OPTIONS:
+            options[arg[2:]] = True
+        else:
+            positional.append(arg)
+    return options, positional
+
+
+def lint_file(
+        file: str, cache: Optional[ResultCache] = None, profiler: Optional[Profiler] = None,
+        name_index: Optional[NameIndex] = None, max_results: Optional[int] = None, content_hash: bool = False
+) -> Tuple[List[Tuple[int, str, Result]], Optional[str]]:
+    """ Checks a single file and returns all results as (lnr, line, result)-tuples
+    and, if `content_hash` is set, the SHA-256 of the file content (used by `--checkpoint`), otherwise None
+
+    If the file is found in `cache`, the cached results are returned without checking the file.
+    If `max_results` is set, the file is only checked until this number of results was found
+    (cached results are returned completely).
+    """
+    data = read_content(file) if profiler is None else profiler.read_content(file)
+    file_hash = hashlib.sha256(data).hexdigest() if content_hash else None
+
+    key = None
+    if cache is not None:
+        key = cache.key(file, data)
+        if (cached := cache.get(key)) is not None:
+            return cached, file_hash
+
+    results = []
+
+    def collect(_: str, lnr: int, line: str, result: Result):
+        results.append((lnr, line, result))
+
+    lines, ascii_only = decode_lines(data)
+    # the checks only keep the path (not e.g. the content of an `ArchiveMember`)
+    check_file(str(file), lines, collect, profiler, name_index, ascii_only, max_results)
+
+    # incomplete results are not cached
+    if cache is not None and (max_results is None or len(results) < max_results):
+        cache.put(key, results)
+    return results, file_hash
+
+
+def lint_file_profiled(
+        file: str, cache: Optional[ResultCache] = None, max_results: Optional[int] = None, content_hash: bool = False
+) -> Tuple[Tuple[list, Optional[str]], Profiler]:
+    """ Same as `lint_file`, but also returns the profile of the file (used by worker processes)
+    """
+    profiler = Profiler()
+    return lint_file(file, cache, profiler, None, max_results, content_hash), profiler
+
+
+def lint_files_parallel(
+        files: List[str], jobs: int, cache: Optional[ResultCache] = None, profiler: Optional[Profiler] = None,
+        max_results: Optional[int] = None, content_hash: bool = False
+):
+    """ Checks `files` using a pool of `jobs` worker processes
+
+    The largest files are scheduled first to keep the pool evenly loaded,
+    but the (file, results, hash)-tuples are yielded in the original order of `files` as soon as they are available.
+    Files which were not checked yet are canceled if the generator is closed.
+    """
+    def file_size(index: int) -> int:
+        if isinstance(files[index], ArchiveMember):
+            return len(files[index].data)
+        try:
+            return os.path.getsize(files[index])
+        except OSError:
+            return 0
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [None] * len(files)
+        for index in sorted(range(len(files)), key=file_size, reverse=True):
+            if profiler is not None:
+                futures[index] = executor.submit(lint_file_profiled, files[index], cache, max_results, content_hash)
+            else:
+                futures[index] = executor.submit(
+                    lint_file, files[index], cache, None, None, max_results, content_hash
+                )
+        try:
+            for file, future in zip(files, futures):
+                if profiler is None:
+                    yield file, *future.result()
+                    continue
+                (results, file_hash), file_profiler = future.result()
+                profiler.merge(file_profiler)
+                yield file, results, file_hash
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def fix_files(files: Iterable[str], dry_run: bool = False):
+    """ Fixes `files` one by one (see lint_fix.py) and yields the file, its remaining results and None
+    (same as the other checks, the hash of a fixed file isn't known)
+
+    With `dry_run` the files are not written, the diff of each file is printed before its results
+    """
+    from lint_fix import fix_file
+
+    for file in files:
+        results, diff = fix_file(file, dry_run)
+        sys.stdout.writelines(diff)
+        yield file, results, None
+
+
 def main():
     """ Main entrypoint
     """
 
     # print syntax
     if len(sys.argv) <= 1:
-        print("$ python3 main.py <format> [file_1] [file_2] ... [file_n]")
-        print(f"Formats: {', '.join(FORMATS.keys())}")
+        print_usage()
         sys.exit(1)
 
-    if sys.argv[1] not in FORMATS:
+    options, args = parse_options(sys.argv[1:])
+
+    if len(args) <= 0 or args[0] not in FORMATS:
         print(f"error: Unknown format! Formats: {', '.join(FORMATS.keys())}")
         sys.exit(1)
 
-    fmt = FORMATS[sys.argv[1]]()
+    try:
+        jobs = int(options.get("jobs", 1)) or os.cpu_count()
+        cache_size = int(options.get("cache-size", DEFAULT_MAX_ENTRIES))
+        max_per_file = int(options["max-errors-per-file"]) if "max-errors-per-file" in options else None
+        max_total = int(options["max-errors"]) if "max-errors" in options else None
+    except ValueError:
+        print("error: '--jobs', '--cache-size', '--max-errors-per-file' and '--max-errors' expect a number")
+        sys.exit(1)
+    fail_fast = options.get("fail-fast", False)
+
+    profiler = None
+    if options.get("profile") or options.get("profile-output"):
+        profiler = Profiler()
+
+    # the name index is shared between all files, so they have to be checked in this process
+    name_index = None
+    if options.get("cross-file-names"):
+        name_index = NameIndex()
+        jobs = 1
+
+    fix = options.get("fix", False)
+    if fix and (name_index is not None or profiler is not None or "server" in options):
+        print("error: '--fix' cannot be combined with '--cross-file-names', '--profile' or '--server'")
+        sys.exit(1)
+    if (fix or "server" in options) and any(z.startswith("archive:") for z in args[1:]):
+        print("error: 'archive:' cannot be combined with '--fix' or '--server'")
+        sys.exit(1)
+    if options.get("dry-run") and not fix:
+        print("error: '--dry-run' requires '--fix'")
+        sys.exit(1)
+    if options.get("resume") and ("checkpoint" not in options or name_index is not None):
+        print("error: '--resume' requires '--checkpoint' and cannot be combined with '--cross-file-names'")
+        sys.exit(1)
+
+    cache = None
+    if not options.get("no-cache") and profiler is None and name_index is None and not fix:
+        cache = ResultCache(options.get("cache-dir", DEFAULT_CACHE_DIR), cache_size)
+
+    fmt = load_format(args[0])
     error_callback = fmt.get("result") or unused
     file_start_callback = fmt.get("file_start") or unused
     file_done_callback = fmt.get("file_done") or unused
     all_done_callback = fmt.get("all_done") or unused
 
-    files = sys.argv[2:]
-    if len(files) <= 0:
+    if profiler is not None:
+        error_callback = profiler.wrap_callback(error_callback)
+        file_start_callback = profiler.wrap_callback(file_start_callback)
+        file_done_callback = profiler.wrap_callback(file_done_callback)
+        all_done_callback = profiler.wrap_callback(all_done_callback)
+
+    # read NUL-separated files from stdin
+    if options.get("null") and len(args) <= 1:
+        args.append("-")
+
+    if len(args) <= 1 and "diff" not in options:
         print("[lint] no files to check")
         return
 
-    removes = []
-    
-    for file in files:
-        if file.startswith("glob:"):
-            removes.append(file)
-            files.extend(glob(file[5:], recursive=True))
-        if file.startswith("file:"):
-            removes.append(file)
-            with open(file[5:], "r", encoding='utf-8') as fd:
-                files.extend([z.strip() for z in fd.readlines() if len(z.strip()) > 0])
-        if file.startswith("json:"):
-            removes.append(file)
-            with open(file[5:], "r", encoding='utf-8') as fd:
-                files.extend([z.strip() for z in json.load(fd) if len(z.strip()) > 0])
-            
-    for remove in removes:
-        files.remove(remove)
+    # files are checked as soon as they are found
+    files: Iterable[str] = discover_files(args[1:], options.get("null", False))
+
+    # only keep changed files, results are filtered by changed lines below
+    changed = None
+    if base := options.get("diff"):
+        from lint_diff import changed_files
+
+        try:
+            changed = changed_files(base)
+        except OSError as err:
+            print(f"error: cannot get changes since '{base}': {err}")
+            sys.exit(1)
+        if len(args) > 1:
+            files = (z for z in files if os.path.relpath(z) in changed)
+        else:
+            files = list(changed.keys())
 
     error_counter = ErrorCounter()
-    for index, file in enumerate(files):
-        error_counter.reset_file()
 
-        # proxy callback to count warnings
-        # then pass callback to "real" error_callback
-        def proxy_callback(file_path: str, lnr: int, line: str, result: Result):
-            error_counter.inc_file()
-            error_callback(file_path, lnr, line, result)
+    # proxy callback to count warnings
+    # then pass callback to "real" error_callback
+    def proxy_callback(file_path: str, lnr: int, line: str, result: Result):
+        error_counter.inc_file()
+        error_callback(file_path, lnr, line, result)
 
-        file_start_callback(file, index, len(files))
+    # result budgets: results over the budget are suppressed and (if possible) files are not checked completely.
+    # files are checked for one more result than the budget to know if results were suppressed
+    remaining = max_total
 
-        with open(file, "r", encoding='UTF-8') as file_descriptor:
-            check_file(file, file_descriptor, proxy_callback)
+    def file_budget() -> Optional[int]:
+        budgets = [z for z in (max_per_file, remaining) if z is not None]
+        return min(budgets) if budgets else None
 
+    def check_limit(budget: Optional[int]) -> Optional[int]:
+        # results outside the changed lines don't count, so the files have to be checked completely
+        return budget + 1 if budget is not None and changed is None else None
+
+    # the server and the worker processes need all files at once, the number of files is only known then.
+    # formats with a `file_start` callback get the number of files, so all files are discovered first
+    # (the output doesn't depend on how the files are checked).
+    # this keeps the content of all archive members in memory, see README
+    if options.get("server") or jobs > 1 or "file_start" in fmt:
+        files = list(files)
+
+    # the checkpoint stores the hash of every checked file
+    content_hash = "checkpoint" in options
+
+    def check_files(unchecked: Iterable[str]):
+        """ Checks `unchecked` and returns an iterator of (file, results, hash)-tuples
+
+        the hash is None if it isn't needed or known
+        """
+        if fix:
+            return fix_files(unchecked, options.get("dry-run", False))
+        if server := options.get("server"):
+            from lint_server import request_results, DEFAULT_SOCKET
+
+            socket_path = DEFAULT_SOCKET if server == "-" else server
+            try:
+                # the request is sent right away, so a missing server is reported before any output
+                results = list(request_results(socket_path, unchecked))
+            except OSError as err:
+                print(f"error: cannot reach lint server '{socket_path}': {err}")
+                sys.exit(1)
+            return ((file, file_results, None) for file, file_results in zip(unchecked, results))
+        if jobs > 1 and len(unchecked) > 1:
+            return lint_files_parallel(unchecked, jobs, cache, profiler, check_limit(max_per_file), content_hash)
+        return (
+            (file, *lint_file(file, cache, profiler, name_index, check_limit(file_budget()), content_hash))
+            for file in unchecked
+        )
+
+    checkpoint = None
+    if checkpoint_path := options.get("checkpoint"):
+        from lint_checkpoint import Checkpoint
+
+        checkpoint = Checkpoint(checkpoint_path, options.get("resume", False))
+        file_results = checkpoint.resume(files, check_files)
+    else:
+        file_results = check_files(files)
+
+    # number of results over the budgets, not exact if files were not checked completely
+    suppressed = 0
+    suppressed_exact = True
+    stopped = False
+
+    file_count = len(files) if isinstance(files, list) else None
+    index = -1
+    for index, (file, results, file_hash) in enumerate(file_results):
+        error_counter.reset_file()
+        file_start_callback(file, index, file_count)
+        changed_lines = changed[os.path.relpath(file)] if changed is not None else None
+        budget = file_budget()
+        for lnr, line, result in results:
+            if changed_lines is not None and lnr not in changed_lines:
+                continue
+            if budget is not None and error_counter.file_count >= budget:
+                suppressed += 1
+                continue
+            proxy_callback(file, lnr, line, result)
+        limit = check_limit(budget)
+        if limit is not None and len(results) == limit:
+            suppressed_exact = False
         file_done_callback(file, error_counter)
 
+        # files which were not checked completely are not recorded, they are checked again when resuming
+        if checkpoint is not None and (limit is None or len(results) < limit):
+            checkpoint.add(file, results, file_hash)
+
+        if remaining is not None:
+            remaining -= error_counter.file_count
+        if (remaining is not None and remaining <= 0) or (fail_fast and error_counter.file_count > 0):
+            stopped = True
+            break
+
+    if stopped and hasattr(file_results, "close"):
+        # cancel the files which are not checked yet
+        file_results.close()
+    if checkpoint is not None:
+        checkpoint.close()
+
+    if index < 0:
+        print("[lint] no changed files to check" if changed is not None else "[lint] no files to check")
+        return
+
+    if cache is not None:
+        cache.prune()
+
     all_done_callback(error_counter)
 
+    if profiler is not None:
+        if options.get("profile"):
+            profiler.print_table()
+        if profile_output := options.get("profile-output"):
+            profiler.write_json(profile_output)
+
+    if suppressed > 0 or stopped:
+        messages = []
+        if suppressed > 0:
+            messages.append(f"{'' if suppressed_exact else 'at least '}{suppressed} results suppressed")
+        if stopped:
+            messages.append("stopped before all files were checked")
+        print(f"[lint] {', '.join(messages)}", file=sys.stderr)
+
     if error_counter.total_count != 0:
         sys.exit(f"\n[lint] found a total of {error_counter.total_count} warnings/errors")
 
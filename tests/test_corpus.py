@@ -0,0 +1,55 @@
+import random
+import time
+
+from lint_corpus import Signal, find_duplicates
+
+
+def raw_signal(file_path: str, lnr: int, timings: list) -> Signal:
+    signal = Signal(file_path, lnr, f"signal {lnr}")
+    signal.values["type"] = "raw"
+    signal.timings = timings
+    return signal
+
+
+def test_raw_duplicates_recall():
+    # pairs of raw signals, the second one with ±2% jitter on every timing
+    rnd = random.Random(1)
+    signals = []
+    for lnr in range(200):
+        timings = [round(rnd.choice((300, 560, 1200, 1690, 4500, 9000)) * rnd.uniform(0.9, 1.1))
+                   for _ in range(rnd.randrange(20, 140))]
+        signals.append(raw_signal("a.ir", lnr, timings))
+        signals.append(raw_signal("b.ir", lnr, [round(z * rnd.uniform(0.98, 1.02)) for z in timings]))
+
+    groups = find_duplicates(signals)
+    found = [z for z in groups if len(z) == 2 and z[0].lnr == z[1].lnr]
+    assert len(found) >= 196
+    assert len(found) == len(groups)
+
+
+def test_raw_duplicates_scale():
+    # NEC-shaped captures: every signal has the same header and marks, only the spaces differ
+    rnd = random.Random(1)
+    signals = []
+    for lnr in range(5000):
+        timings = [9000, 4500]
+        for _ in range(32):
+            timings += [560, rnd.choice((560, 1690))]
+        timings.append(560)
+        for file_path in ("a.ir", "b.ir") if lnr < 200 else ("a.ir",):
+            signals.append(raw_signal(file_path, lnr, [round(z * rnd.uniform(0.97, 1.03)) for z in timings]))
+
+    start = time.perf_counter()
+    groups = find_duplicates(signals)
+    assert time.perf_counter() - start < 5
+    assert len([z for z in groups if len(z) == 2 and z[0].lnr == z[1].lnr]) == 200
+    assert len(groups) == 200
+
+
+def test_raw_different():
+    signals = [
+        raw_signal("a.ir", 1, [9000, 4500, 560, 560, 560, 1690]),
+        raw_signal("b.ir", 1, [9000, 4500, 560, 1690, 560, 1690]),
+        raw_signal("c.ir", 1, [9000, 4500, 560, 560, 560]),
+    ]
+    assert find_duplicates(signals) == []
@@ -0,0 +1,37 @@
+import time
+
+from lint import DataValidityCheck
+
+
+def test_valid_data():
+    check = DataValidityCheck()
+    assert check.check_key_data("data", " 9000 4500 560  560 ") is None
+
+
+def test_invalid_characters():
+    check = DataValidityCheck()
+    result = check.check_key_data("data", "9000 45x0 -")
+    assert result.error == "character not allowed here (non-Digit)"
+    assert [(z.start, z.end) for z in result.indicators] == [(12, 13)]
+
+
+def test_lone_minus():
+    check = DataValidityCheck()
+    assert check.check_key_data("data", "9000 - 4500") is None
+    assert check.check_key_data("data", " - ").error == "data must contain at least one timing"
+
+
+def test_pathological_line():
+    # many separators without numbers made the data pattern backtrack exponentially (or quadratically),
+    # 200k spaces would take minutes then
+    check = DataValidityCheck()
+    start = time.perf_counter()
+    result = check.check_key_data("data", " " * 200_000 + "x")
+    assert time.perf_counter() - start < 1
+    assert result.error == "character not allowed here (non-Digit)"
+
+
+def test_surrounding_spaces():
+    check = DataValidityCheck()
+    assert check.check_key_data("data", "  9000 4500  ") is None
+    assert check.check_key_data("data", "\t9000").error == "character not allowed here (non-Digit)"